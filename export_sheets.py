@@ -0,0 +1,133 @@
+"""
+응답 내보내기 (Sheets → 분할 Parquet)
+저장소의 응답을 고정 크기 행 구간으로 나눠 읽고, 열마다 선언된 형식으로 변환해
+응답 날짜별로 분할된 Parquet 데이터셋에 바로 씁니다.
+
+get_all_values()처럼 시트 전체를 문자열로 메모리에 올리지 않으므로 메모리 사용량은 구간 크기에 묶이며,
+분석에서는 문자열을 다시 파싱할 필요 없이 열 단위로 빠르게 읽을 수 있습니다.
+
+    python export_sheets.py --output data/export
+    pd.read_parquet('data/export', columns=['participant_id', 'total_time_sec'])
+"""
+import argparse
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from sst_schema import CHOICES, GOOGLE_SHEETS_NAME, NUMERIC_COLUMNS, TIMESTAMP_FORMAT, projector
+from storage import load_local_secrets, open_backend
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+EXPORT_PATH = Path(__file__).resolve().parent / "data" / "export"
+
+# 분할 기준 열 (timestamp의 날짜)
+PARTITION_COLUMN = 'date'
+
+
+def column_type(name):
+    """열 이름 → Arrow 형식 (timestamp, 숫자 열(sst_schema.NUMERIC_COLUMNS), 선택지 열(sst_schema.CHOICES) 외에는 문자열)"""
+    if name == 'timestamp':
+        return pa.timestamp('s')
+    if name in NUMERIC_COLUMNS:
+        return pa.float64()
+    if name in CHOICES:
+        return pa.dictionary(pa.int8(), pa.string())
+    return pa.string()
+
+
+def export_schema(headers):
+    """헤더 목록 → 내보내기 Arrow 스키마 (마지막에 분할 열 포함)"""
+    fields = [pa.field(name, column_type(name)) for name in headers]
+    return pa.schema(fields + [pa.field(PARTITION_COLUMN, pa.string())])
+
+
+def cast_rows(rows, headers):
+    """문자열 행 목록 → 스키마대로 변환한 Arrow 테이블 (변환할 수 없는 값은 결측)"""
+    frame = pd.DataFrame(rows, columns=headers)
+    for name in headers:
+        if name == 'timestamp':
+            frame[name] = pd.to_datetime(frame[name], format=TIMESTAMP_FORMAT, errors='coerce').astype('datetime64[s]')
+        elif name in NUMERIC_COLUMNS:
+            frame[name] = pd.to_numeric(frame[name].replace('', None), errors='coerce').astype(float)
+        elif name in CHOICES:
+            # 선택지를 고정해 모든 분할 파일의 사전(dictionary)이 같게 함 (선택지 밖의 값은 결측)
+            frame[name] = pd.Categorical(frame[name], categories=CHOICES[name])
+        else:
+            frame[name] = frame[name].replace('', None)
+    if 'timestamp' in headers:
+        frame[PARTITION_COLUMN] = frame['timestamp'].dt.strftime('%Y-%m-%d').fillna('unknown')
+    else:
+        frame[PARTITION_COLUMN] = 'unknown'
+    return pa.Table.from_pandas(frame, schema=export_schema(headers), preserve_index=False)
+
+
+def iter_tables(backend, headers, page_size=5000, start=0, columns=None):
+    """[start, 끝) 행을 page_size개씩 읽어 (시작 행, Arrow 테이블)로 반환
+
+    headers 폭만큼 읽으므로 read_all_headers()를 주면 채점 결과 열까지 포함됩니다.
+    columns를 주면 그 열만 골라 변환합니다 (sst_schema.projector).
+    """
+    width = len(headers)
+    columns = list(columns or headers)
+    select = projector(columns, headers)
+    while True:
+        rows = backend.read_range(start, start + page_size, width=width)
+        if not rows:
+            return
+        yield start, cast_rows([select((list(row) + [''] * width)[:width]) for row in rows], columns)
+        if len(rows) < page_size:
+            return
+        start += len(rows)
+
+
+def export(backend, output, page_size=5000, columns=None, compression='snappy', log=print,
+           include_derived=False):
+    """저장소 전체를 output 디렉터리에 date=YYYY-MM-DD/part-<시작 행>-*.parquet로 내보내고 행 수 반환
+
+    columns: 내보낼 열 목록 (기본은 전체)
+    compression: Parquet 압축 방식 (보관용은 'zstd')
+    include_derived: 응답 열 뒤의 채점 결과 열(score_*, review_*)까지 내보냄 (문자열 그대로)
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다.")
+    headers = backend.read_all_headers() if include_derived else backend.read_headers()
+    if not headers:
+        log("저장소가 비어 있습니다.")
+        return 0
+
+    exported = 0
+    for start, table in iter_tables(backend, headers, page_size, columns=columns):
+        pq.write_to_dataset(
+            table, root_path=str(output), partition_cols=[PARTITION_COLUMN],
+            basename_template=f"part-{start:09d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore', compression=compression
+        )
+        exported += table.num_rows
+        log(f"   {start + table.num_rows}행까지 내보냄")
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 응답을 분할 Parquet로 내보내기")
+    parser.add_argument("--output", default=str(EXPORT_PATH), help="내보낼 디렉터리")
+    parser.add_argument("--page-size", type=int, default=5000, help="한 번에 읽을 행 수")
+    parser.add_argument("--columns", nargs="+", default=None, help="내보낼 열 (기본: 전체)")
+    parser.add_argument("--overwrite", action="store_true", help="기존 내보내기 디렉터리를 지우고 다시 씀")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    if output.exists() and any(output.iterdir()):
+        if not args.overwrite:
+            raise SystemExit(f"{output}가 비어 있지 않습니다. 다시 내보내려면 --overwrite를 주세요.")
+        shutil.rmtree(output)
+
+    backend = open_backend(load_local_secrets(), GOOGLE_SHEETS_NAME)
+    total = export(backend, output, page_size=args.page_size, columns=args.columns)
+    print(f"{total}행 내보냄: {output}")
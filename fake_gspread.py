@@ -0,0 +1,391 @@
+"""
+오프라인 테스트용 가짜 gspread
+네트워크 없이 쓰기 경로(저장, 초기화, 시뮬레이션 업로드)의 처리량과 지연을 측정할 수 있도록
+앱이 사용하는 gspread Client/Spreadsheet/Worksheet 기능을 프로세스 안에서 흉내 냅니다.
+
+- 요청마다 지연 시간 주입 (latency_ms, jitter_ms)
+- 분당 읽기/쓰기 한도 초과 시 429 오류
+- failure_rate 확률로 503 오류
+
+    python fake_gspread.py --rows 2000 --latency-ms 300 --writes-per-minute 60
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from collections import deque
+
+try:
+    from gspread import SpreadsheetNotFound, WorksheetNotFound
+except ImportError:
+    class SpreadsheetNotFound(Exception):
+        pass
+
+    class WorksheetNotFound(Exception):
+        pass
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError처럼 response.status_code와 code를 가진 오류"""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"[{status_code}]: {message}")
+        headers = {} if retry_after is None else {'Retry-After': str(retry_after)}
+        self.response = _FakeResponse(status_code, headers)
+        self.code = status_code
+
+
+class FakeServer:
+    """가짜 Sheets API 서버: 데이터, 지연, 쿼터, 장애 주입, 호출 통계
+
+    quota_window_sec: 쿼터 집계 구간 (실제 API는 60초, 빠른 테스트에서는 줄여서 사용)
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, reads_per_minute=None, writes_per_minute=None,
+                 failure_rate=0.0, quota_window_sec=60.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.quotas = {'read': reads_per_minute, 'write': writes_per_minute}
+        self.failure_rate = failure_rate
+        self.quota_window_sec = quota_window_sec
+        self.spreadsheets = {}
+        self.stats = {'read': 0, 'write': 0, 'rate_limited': 0, 'failed': 0}
+        self._history = {'read': deque(), 'write': deque()}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def request(self, kind):
+        """API 요청 한 번: 지연 → 장애 → 쿼터 순으로 처리"""
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        with self._lock:
+            if self._random.random() < self.failure_rate:
+                self.stats['failed'] += 1
+                raise FakeAPIError(503, "The service is currently unavailable.")
+
+            limit = self.quotas[kind]
+            if limit is not None:
+                now = time.monotonic()
+                history = self._history[kind]
+                while history and now - history[0] >= self.quota_window_sec:
+                    history.popleft()
+                if len(history) >= limit:
+                    self.stats['rate_limited'] += 1
+                    retry_after = self.quota_window_sec - (now - history[0])
+                    raise FakeAPIError(429, f"Quota exceeded for {kind} requests.", retry_after=retry_after)
+                history.append(now)
+
+            self.stats[kind] += 1
+
+    def create(self, title):
+        with self._lock:
+            spreadsheet = FakeSpreadsheet(self, title)
+            self.spreadsheets[title] = spreadsheet
+            return spreadsheet
+
+
+_A1_RE = re.compile(r'^([A-Z]*)(\d*)$')
+
+
+def _col_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index
+
+
+def _parse_range(cell_range):
+    """'A2:AC100' → (행 시작, 열 시작, 행 끝 또는 None, 열 끝 또는 None), 1부터 시작"""
+    cell_range = cell_range.split('!')[-1].upper()
+    start, _, end = cell_range.partition(':')
+    start_col, start_row = _A1_RE.match(start).groups()
+    r1 = int(start_row) if start_row else 1
+    c1 = _col_index(start_col) if start_col else 1
+    if not end:
+        return r1, c1, r1, c1
+    end_col, end_row = _A1_RE.match(end).groups()
+    r2 = int(end_row) if end_row else None
+    c2 = _col_index(end_col) if end_col else None
+    return r1, c1, r2, c2
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, sheet_id, title):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+        self._rows = []
+        self._cols = 26
+
+    @property
+    def _server(self):
+        return self.spreadsheet.server
+
+    @property
+    def row_count(self):
+        return max(1000, len(self._rows))
+
+    @property
+    def col_count(self):
+        # 행 추가(append)는 격자를 자동으로 넓히지만 범위 쓰기(update)는 넓히지 않음
+        return max([self._cols] + [len(row) for row in self._rows])
+
+    def _trimmed(self, row):
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        return row
+
+    def get_all_values(self):
+        self._server.request('read')
+        width = max([0] + [len(row) for row in self._rows])
+        return [list(row) + [''] * (width - len(row)) for row in self._rows]
+
+    def row_values(self, row):
+        self._server.request('read')
+        if row > len(self._rows):
+            return []
+        return self._trimmed(self._rows[row - 1])
+
+    def get(self, cell_range):
+        self._server.request('read')
+        r1, c1, r2, c2 = _parse_range(cell_range)
+        rows = self._rows[r1 - 1:r2]
+        result = [self._trimmed(row[c1 - 1:c2]) for row in rows]
+        # 실제 API처럼 뒤쪽 빈 행은 생략
+        while result and not result[-1]:
+            result.pop()
+        return result
+
+    def append_row(self, values, **kwargs):
+        self.append_rows([values], **kwargs)
+
+    def append_rows(self, values, **kwargs):
+        self._server.request('write')
+        self._rows.extend(['' if v is None else str(v) for v in row] for row in values)
+
+    def update(self, values=None, range_name=None, **kwargs):
+        # gspread 6: update(values, range_name) / gspread 5: update(range_name, values)
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self._server.request('write')
+        self._write_block(range_name or 'A1', values)
+
+    def batch_update(self, data, **kwargs):
+        self._server.request('write')
+        for item in data:
+            self._write_block(item['range'], item['values'])
+
+    def _write_block(self, cell_range, values):
+        r1, c1, _, _ = _parse_range(cell_range)
+        if c1 - 1 + max([0] + [len(row) for row in values]) > self.col_count:
+            raise FakeAPIError(400, f"Range ({self.title}!{cell_range}) exceeds grid limits.")
+        for i, row in enumerate(values):
+            r = r1 - 1 + i
+            while len(self._rows) <= r:
+                self._rows.append([])
+            target = self._rows[r]
+            needed = c1 - 1 + len(row)
+            if len(target) < needed:
+                target.extend([''] * (needed - len(target)))
+            for j, value in enumerate(row):
+                target[c1 - 1 + j] = '' if value is None else str(value)
+
+    def clear(self):
+        self._server.request('write')
+        self._rows = []
+
+    def resize(self, rows=None, cols=None):
+        self._server.request('write')
+        if rows is not None:
+            del self._rows[rows:]
+        if cols is not None:
+            self._rows = [row[:cols] for row in self._rows]
+            self._cols = cols
+
+    def add_cols(self, cols):
+        self._server.request('write')
+        self._cols = self.col_count + cols
+
+
+class FakeSpreadsheet:
+    def __init__(self, server, title):
+        self.server = server
+        self.title = title
+        self.id = f"fake-{title}"
+        self._worksheets = [FakeWorksheet(self, 0, 'Sheet1')]
+
+    @property
+    def sheet1(self):
+        return self.get_worksheet(0)
+
+    def get_worksheet(self, index):
+        self.server.request('read')
+        return self._worksheets[index] if index < len(self._worksheets) else None
+
+    def worksheets(self):
+        self.server.request('read')
+        return list(self._worksheets)
+
+    def worksheet(self, title):
+        self.server.request('read')
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows=1000, cols=26, index=None):
+        self.server.request('write')
+        worksheet = FakeWorksheet(self, max(w.id for w in self._worksheets) + 1, title)
+        worksheet._cols = cols
+        if index is None:
+            self._worksheets.append(worksheet)
+        else:
+            self._worksheets.insert(index, worksheet)
+        return worksheet
+
+    def duplicate_sheet(self, source_sheet_id, insert_sheet_index=None, new_sheet_name=None, **kwargs):
+        self.server.request('write')
+        source = next(w for w in self._worksheets if w.id == source_sheet_id)
+        copy = FakeWorksheet(self, max(w.id for w in self._worksheets) + 1,
+                             new_sheet_name or f"Copy of {source.title}")
+        copy._rows = [list(row) for row in source._rows]
+        copy._cols = source._cols
+        if insert_sheet_index is None:
+            self._worksheets.append(copy)
+        else:
+            self._worksheets.insert(insert_sheet_index, copy)
+        return copy
+
+    def batch_update(self, body):
+        """spreadsheets.batchUpdate 중 열 구조 변경(insert/delete/moveDimension)과 행 삭제만 지원"""
+        self.server.request('write')
+        for request in body['requests']:
+            (kind, spec), = request.items()
+            dimension = spec.get('range', spec.get('source'))
+            worksheet = next(w for w in self._worksheets if w.id == dimension['sheetId'])
+            start, end = dimension['startIndex'], dimension['endIndex']
+            if dimension['dimension'] == 'ROWS' and kind == 'deleteDimension':
+                del worksheet._rows[start:end]
+                continue
+            if dimension['dimension'] != 'COLUMNS':
+                raise NotImplementedError("fake_gspread는 열 구조 변경과 행 삭제만 지원합니다.")
+            rows = [row + [''] * (worksheet.col_count - len(row)) for row in worksheet._rows]
+            if kind == 'insertDimension':
+                rows = [row[:start] + [''] * (end - start) + row[start:] for row in rows]
+                worksheet._cols = worksheet.col_count + end - start
+            elif kind == 'deleteDimension':
+                rows = [row[:start] + row[end:] for row in rows]
+                worksheet._cols = worksheet.col_count - (end - start)
+            elif kind == 'moveDimension':
+                # destinationIndex는 옮기기 전 좌표 기준
+                destination = spec['destinationIndex']
+                for i, row in enumerate(rows):
+                    moved = row[start:end]
+                    rest = row[:start] + row[end:]
+                    at = destination if destination <= start else destination - (end - start)
+                    rows[i] = rest[:at] + moved + rest[at:]
+            else:
+                raise NotImplementedError(kind)
+            worksheet._rows = [worksheet._trimmed(row) for row in rows]
+        return {'replies': [{} for _ in body['requests']]}
+
+
+class FakeClient:
+    """gspread.Client 대역 (open은 Drive 조회처럼 읽기 요청 한 번으로 계산)"""
+
+    def __init__(self, server=None):
+        self.server = server or FakeServer()
+
+    def open(self, title):
+        self.server.request('read')
+        try:
+            return self.server.spreadsheets[title]
+        except KeyError:
+            raise SpreadsheetNotFound(title) from None
+
+    def create(self, title):
+        self.server.request('write')
+        return self.server.create(title)
+
+
+def install(server=None, spreadsheet_name=None):
+    """sheets_client가 실제 Google API 대신 가짜 클라이언트를 쓰도록 설치"""
+    import sheets_client
+
+    client = FakeClient(server)
+    if spreadsheet_name is not None and spreadsheet_name not in client.server.spreadsheets:
+        client.server.create(spreadsheet_name)
+    sheets_client.install_client(client)
+    return client
+
+
+def _benchmark(args):
+    """가짜 서버로 앱의 쓰기 경로(쓰기 큐 → SheetsBackend → SheetsWriter) 처리량 측정"""
+    from sheets_writer import SheetsWriter
+    from storage import SheetsBackend
+    from write_queue import WriteBehindQueue
+
+    server = FakeServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        writes_per_minute=args.writes_per_minute,
+        reads_per_minute=args.reads_per_minute,
+        failure_rate=args.failure_rate,
+        quota_window_sec=args.quota_window_sec,
+        seed=args.seed
+    )
+    install(server, 'SST_Bench')
+    # 클라이언트 측 한도도 같은 쿼터 구간으로 맞춤
+    scale = 60.0 / args.quota_window_sec
+    writer = SheetsWriter(
+        writes_per_minute=args.writes_per_minute * scale,
+        reads_per_minute=args.reads_per_minute * scale,
+        base_delay=0.05, max_delay=2.0, retries_per_minute=1000
+    )
+    backend = SheetsBackend({}, 'SST_Bench', writer=writer)
+    headers = [f"col_{i}" for i in range(args.columns)]
+    backend.ensure_schema(headers)
+
+    def sink(rows):
+        backend.append_many(rows)
+
+    write_queue = WriteBehindQueue(sink, flush_interval=args.flush_interval,
+                                   max_batch=args.max_batch, max_pending=args.rows).start()
+    started = time.perf_counter()
+    for i in range(args.rows):
+        write_queue.submit([f"P{i:05d}"] + ["응답"] * (args.columns - 1))
+    submitted = time.perf_counter()
+    write_queue.wait_idle()
+    finished = time.perf_counter()
+
+    print(f"행 수: {args.rows}, 제출 {submitted - started:.3f}초, 기록 완료 {finished - started:.3f}초")
+    print(f"처리량: {args.rows / (finished - started):.1f}행/초")
+    print(f"서버: {server.stats}")
+    print(f"클라이언트: {writer.stats}")
+    print(f"쓰기 큐: {write_queue.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Sheets 서버로 쓰기 경로 벤치마크")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=29)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--writes-per-minute", type=int, default=60)
+    parser.add_argument("--reads-per-minute", type=int, default=60)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--quota-window-sec", type=float, default=60.0)
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    _benchmark(parser.parse_args())
@@ -1,34 +1,29 @@
 """
 SST 시뮬레이션 데이터 생성 스크립트
-15개의 샘플 응답을 생성하여 Google Sheets에 반영하고 CSV로 저장합니다.
+시드가 고정된 시뮬레이션 응답을 생성하여 CSV/Parquet로 저장하고 Google Sheets에 반영합니다.
+
+NumPy/pandas로 청크 단위 벡터 연산을 하므로 10만 명 이상도 메모리 사용량이
+청크 크기에 묶인 채로 생성/저장/업로드할 수 있습니다.
+
+    python generate_simulation.py                              # 15명, CSV 저장 + Sheets 업로드
+    python generate_simulation.py --rows 100000 --format parquet --no-upload
 """
-import toml
-import random
-import csv
+import argparse
+import sys
 from datetime import datetime, timedelta
-from google.oauth2.service_account import Credentials
-import gspread
-
-# Google Sheets 설정
-GOOGLE_SHEETS_NAME = "SST_Responses"
-
-# 질문 목록
-QUESTIONS = [
-    {"id": "S1", "type": "spontaneous"},
-    {"id": "C1", "type": "comprehension"},
-    {"id": "C2", "type": "comprehension"},
-    {"id": "C3", "type": "comprehension"},
-    {"id": "C4", "type": "comprehension"},
-    {"id": "M1", "type": "mental_state"},
-    {"id": "M2", "type": "mental_state"},
-    {"id": "M3", "type": "mental_state"},
-    {"id": "M4", "type": "mental_state"},
-    {"id": "M5", "type": "mental_state"},
-    {"id": "M6", "type": "mental_state"},
-    {"id": "M7", "type": "mental_state"},
-    {"id": "M8", "type": "mental_state"},
-    {"id": "C5", "type": "comprehension"},
-]
+
+import numpy as np
+import pandas as pd
+
+from sst_schema import CHOICES, ENCODER, GOOGLE_SHEETS_NAME, HEADERS, QUESTIONS, TIMESTAMP_FORMAT
+from storage import load_local_secrets, open_backend
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # 샘플 응답 데이터
 SAMPLE_RESPONSES = {
@@ -132,182 +127,250 @@ SAMPLE_RESPONSES = {
     ]
 }
 
-# 샘플 참가자 데이터
-SAMPLE_PARTICIPANTS = [
-    {"age": 23, "gender": "여성", "education": "대학원 재학/수료/졸업"},
-    {"age": 45, "gender": "남성", "education": "4년제 대학교 졸업"},
-    {"age": 31, "gender": "여성", "education": "4년제 대학교 졸업"},
-    {"age": 28, "gender": "남성", "education": "대학원 재학/수료/졸업"},
-    {"age": 52, "gender": "여성", "education": "고등학교 졸업"},
-    {"age": 19, "gender": "여성", "education": "고등학교 졸업"},
-    {"age": 36, "gender": "남성", "education": "전문대학교 졸업"},
-    {"age": 41, "gender": "여성", "education": "4년제 대학교 졸업"},
-    {"age": 25, "gender": "남성", "education": "4년제 대학교 졸업"},
-    {"age": 33, "gender": "여성", "education": "대학원 재학/수료/졸업"},
-    {"age": 29, "gender": "남성", "education": "전문대학교 졸업"},
-    {"age": 47, "gender": "여성", "education": "4년제 대학교 졸업"},
-    {"age": 22, "gender": "남성", "education": "고등학교 졸업"},
-    {"age": 38, "gender": "여성", "education": "대학원 재학/수료/졸업"},
-    {"age": 26, "gender": "남성", "education": "4년제 대학교 졸업"},
-]
-
-def get_google_sheets_client():
-    """Google Sheets 클라이언트 생성"""
+def get_storage_backend():
+    """저장소 백엔드 생성 (.streamlit/secrets.toml 설정, 기본은 Google Sheets)"""
     try:
-        with open('.streamlit/secrets.toml', 'r') as f:
-            secrets = toml.load(f)
-
-        credentials_dict = secrets["gcp_service_account"]
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        credentials = Credentials.from_service_account_info(credentials_dict, scopes=scopes)
-        client = gspread.authorize(credentials)
-        return client
+        return open_backend(load_local_secrets(), GOOGLE_SHEETS_NAME)
     except Exception as e:
-        print(f"Google Sheets 연결 실패: {e}")
+        print(f"저장소 연결 실패: {e}")
         return None
 
-def generate_simulation_data():
-    """15개의 시뮬레이션 데이터 생성"""
-    data = []
-    base_time = datetime.now() - timedelta(days=7)
-
-    for i in range(15):
-        participant = SAMPLE_PARTICIPANTS[i]
-        timestamp = (base_time + timedelta(hours=i*5, minutes=random.randint(0, 59))).strftime("%Y-%m-%d %H:%M:%S")
-
-        # 사전 질문 응답 (일부는 "예", 일부는 "아니오")
-        if i % 5 == 0:  # 5명 중 1명은 이전에 읽은 적 있음
-            read_before = "예"
-            read_when = random.choice(["5년 전", "고등학교 때", "3년 전", "대학교 때"])
-            read_memory = random.choice(["대략적인 줄거리만 기억", "거의 기억 안 남", "줄거리와 인물 기억"])
-            read_context = random.choice(["학교", "취미"])
-            if read_context == "학교":
-                read_grade = random.choice(["고등학교 2학년", "고등학교 3학년", "대학교 1학년"])
-                read_class = random.choice(["문학", "국어", "영미문학"])
-            else:
-                read_grade = ""
-                read_class = ""
-        else:
-            read_before = "아니오"
-            read_when = ""
-            read_memory = ""
-            read_context = ""
-            read_grade = ""
-            read_class = ""
-
-        if i % 4 == 0:  # 4명 중 1명은 이야기가 익숙함
-            familiar = "예"
-            familiar_knowledge = random.choice([
-                "헤밍웨이의 단편소설이라고 들은 적 있습니다.",
-                "제목만 들어본 적 있습니다.",
-                "유명한 이별 이야기라고 알고 있습니다."
-            ])
-            familiar_discussion = random.choice([
-                "친구와 이 소설에 대해 이야기한 적 있습니다.",
-                "수업 시간에 토론한 적 있습니다.",
-                "없습니다."
-            ])
-        else:
-            familiar = "아니오"
-            familiar_knowledge = ""
-            familiar_discussion = ""
-
-        # 응답 시간
-        story_read_time = random.randint(180, 420)  # 3~7분
-        total_time = story_read_time + random.randint(300, 600)  # 추가 5~10분
-
-        row = {
-            'timestamp': timestamp,
-            'participant_id': f"P{str(i+1).zfill(3)}",
-            'age': participant['age'],
-            'gender': participant['gender'],
-            'education': participant['education'],
-            'story_read_time_sec': story_read_time,
-            'total_time_sec': total_time,
-            'read_before': read_before,
-            'read_when': read_when,
-            'read_memory': read_memory,
-            'read_context': read_context,
-            'read_grade': read_grade,
-            'read_class': read_class,
-            'familiar': familiar,
-            'familiar_knowledge': familiar_knowledge,
-            'familiar_discussion': familiar_discussion
-        }
-
-        # 질문 응답 추가
-        for q in QUESTIONS:
-            row[f"response_{q['id']}"] = random.choice(SAMPLE_RESPONSES[q['id']])
-
-        data.append(row)
-
-    return data
-
-def save_to_google_sheets(data):
-    """Google Sheets에 데이터 저장"""
-    client = get_google_sheets_client()
-    if client is None:
-        return False
+# 시뮬레이션 분포 설정
+READ_BEFORE_RATE = 0.2               # 이전에 읽은 적 있는 비율
+FAMILIAR_RATE = 0.25                 # 익숙하다고 답한 비율 (읽은 적 없는 경우)
+FAMILIAR_RATE_IF_READ = 0.8          # 읽은 적 있는 경우 익숙하다고 답한 비율
+STORY_READ_MEDIAN_SEC = 300          # 소설 읽기 시간 중앙값 (로그정규)
+QUESTIONS_MEDIAN_SEC = 450           # 질문 응답 시간 중앙값 (로그정규)
+MEAN_ARRIVAL_INTERVAL_SEC = 600      # 참가자 도착 간격 평균 (지수분포, 행이 많으면 SIMULATION_DAYS 안에 들도록 줄임)
+SIMULATION_DAYS = 7                  # 응답 시각 범위: 지금부터 며칠 전까지
+FIRST_INPUT_BETA = (2, 5)            # 제출까지 시간 중 첫 입력까지의 비율 (베타분포)
 
-    try:
-        spreadsheet = client.open(GOOGLE_SHEETS_NAME)
-        worksheet = spreadsheet.sheet1
+READ_WHEN_CHOICES = ["5년 전", "고등학교 때", "3년 전", "대학교 때"]
+READ_MEMORY_CHOICES = ["대략적인 줄거리만 기억", "거의 기억 안 남", "줄거리와 인물 기억"]
+READ_CONTEXT_CHOICES = CHOICES['read_context']  # 앱의 선택지 그대로 ("기타"면 read_context_other 입력)
+READ_CONTEXT_OTHER_CHOICES = ["독서모임", "온라인 추천", "지인 권유"]
+READ_GRADE_CHOICES = ["고등학교 2학년", "고등학교 3학년", "대학교 1학년"]
+READ_CLASS_CHOICES = ["문학", "국어", "영미문학"]
+FAMILIAR_KNOWLEDGE_CHOICES = [
+    "헤밍웨이의 단편소설이라고 들은 적 있습니다.",
+    "제목만 들어본 적 있습니다.",
+    "유명한 이별 이야기라고 알고 있습니다."
+]
+FAMILIAR_DISCUSSION_CHOICES = [
+    "친구와 이 소설에 대해 이야기한 적 있습니다.",
+    "수업 시간에 토론한 적 있습니다.",
+    "없습니다."
+]
+
+
+def _choice_where(rng, mask, choices):
+    """mask가 True인 행에만 choices 중 하나를 뽑고 나머지는 빈 문자열"""
+    picked = np.asarray(choices, dtype=object)[rng.integers(0, len(choices), mask.shape[0])]
+    return np.where(mask, picked, "")
+
+
+def arrival_interval(rows):
+    """rows명의 도착 시각이 SIMULATION_DAYS 안에 들도록 하는 평균 도착 간격(초)
+
+    간격 합의 표준편차(평균 간격 × √rows)의 3배를 여유로 두어 마지막 응답이 현재 시각을 넘지 않게 함
+    """
+    span = SIMULATION_DAYS * 86400
+    return min(MEAN_ARRIVAL_INTERVAL_SEC, span / (rows + 3 * np.sqrt(rows)))
+
+
+def generate_simulation_frame(n, rng, start_index=0, start_time=None, mean_interval=None):
+    """n명의 시뮬레이션 응답을 한 번의 벡터 연산으로 생성 (DataFrame 반환)
+
+    rng: numpy.random.Generator (청크를 이어서 생성해도 같은 시드면 같은 결과)
+    start_index: 참가자 번호 시작값 (청크 사이 연속 번호)
+    start_time: 첫 참가자 도착 시각
+    mean_interval: 평균 도착 간격(초), 기본은 arrival_interval(n)
+    """
+    if start_time is None:
+        start_time = datetime.now() - timedelta(days=SIMULATION_DAYS)
+    if mean_interval is None:
+        mean_interval = arrival_interval(n)
+
+    # 도착 시각: 지수분포 간격의 누적합
+    arrivals = np.cumsum(rng.exponential(mean_interval, n))
+    timestamps = pd.Timestamp(start_time) + pd.to_timedelta(arrivals, unit='s')
+
+    # 사전 질문 분기
+    read_before = rng.random(n) < READ_BEFORE_RATE
+    read_context = _choice_where(rng, read_before, READ_CONTEXT_CHOICES)
+    at_school = read_context == "학교"
+    other_context = read_context == "기타"
+    familiar = rng.random(n) < np.where(read_before, FAMILIAR_RATE_IF_READ, FAMILIAR_RATE)
+
+    # 응답 시간 (로그정규, 초 단위 정수)
+    story_read_time = np.clip(
+        rng.lognormal(np.log(STORY_READ_MEDIAN_SEC), 0.35, n), 60, 1800
+    ).round().astype(int)
+    questions_time = np.clip(
+        rng.lognormal(np.log(QUESTIONS_MEDIAN_SEC), 0.3, n), 120, 2400
+    ).round().astype(int)
+
+    frame = pd.DataFrame({
+        'timestamp': timestamps.strftime(TIMESTAMP_FORMAT),
+        'participant_id': [f"P{str(i + 1).zfill(3)}" for i in range(start_index, start_index + n)],
+        'story_read_time_sec': story_read_time,
+        'questions_time_sec': questions_time,
+        'total_time_sec': story_read_time + questions_time,
+        'read_before': np.where(read_before, "예", "아니오"),
+        'read_when': _choice_where(rng, read_before, READ_WHEN_CHOICES),
+        'read_memory': _choice_where(rng, read_before, READ_MEMORY_CHOICES),
+        'read_context': read_context,
+        'read_context_other': _choice_where(rng, other_context, READ_CONTEXT_OTHER_CHOICES),
+        'read_grade': _choice_where(rng, at_school, READ_GRADE_CHOICES),
+        'read_class': _choice_where(rng, at_school, READ_CLASS_CHOICES),
+        'familiar': np.where(familiar, "예", "아니오"),
+        'familiar_knowledge': _choice_where(rng, familiar, FAMILIAR_KNOWLEDGE_CHOICES),
+        'familiar_discussion': _choice_where(rng, familiar, FAMILIAR_DISCUSSION_CHOICES),
+    })
+
+    # 질문 응답: 문항별 샘플 응답에서 무작위 선택
+    for q in QUESTIONS:
+        samples = np.asarray(SAMPLE_RESPONSES[q['id']], dtype=object)
+        frame[f"response_{q['id']}"] = samples[rng.integers(0, len(samples), n)]
 
+    # 문항별 반응 시간 (밀리초): 질문 응답 시간을 문항별로 나누고, 그중 일부를 첫 입력까지로
+    shares = rng.gamma(4.0, size=(n, len(QUESTIONS)))
+    submit_ms = questions_time[:, None] * 1000 * shares / shares.sum(axis=1, keepdims=True)
+    first_ms = submit_ms * rng.beta(*FIRST_INPUT_BETA, size=submit_ms.shape)
+    for i, q in enumerate(QUESTIONS):
+        frame[f"rt_{q['id']}_first"] = first_ms[:, i].round(1)
+        frame[f"rt_{q['id']}"] = submit_ms[:, i].round(1)
+
+    # 앱과 같은 열 순서 (sst_schema.HEADERS)
+    return frame[HEADERS]
+
+
+def iter_simulation_chunks(rows, chunk_size=10000, seed=None):
+    """rows명의 시뮬레이션 응답을 chunk_size명씩 생성"""
+    rng = np.random.default_rng(seed)
+    start_time = datetime.now() - timedelta(days=SIMULATION_DAYS)
+    # 청크가 아니라 전체 행 수 기준 간격 (모든 청크를 합쳐 SIMULATION_DAYS 안)
+    mean_interval = arrival_interval(rows)
+    for start in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - start)
+        frame = generate_simulation_frame(
+            n, rng, start_index=start, start_time=start_time, mean_interval=mean_interval
+        )
+        start_time = pd.Timestamp(frame['timestamp'].iloc[-1]).to_pydatetime()
+        yield frame
+
+
+class SimulationSink:
+    """청크를 받아 CSV/Parquet 파일에 이어 쓰고, 선택적으로 저장소에 일괄 업로드"""
+
+    def __init__(self, filename=None, file_format='csv', backend=None, upload_batch=500):
+        if file_format == 'parquet' and not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet 저장에는 pyarrow가 필요합니다.")
+        self.filename = filename
+        self.file_format = file_format
+        self.backend = backend
+        self.upload_batch = upload_batch
+        self._parquet_writer = None
+        self._csv_started = False
+        self.rows = 0
+        self.uploaded = 0
+
+    def write(self, frame):
+        if self.filename and self.file_format == 'csv':
+            # 첫 청크만 헤더와 BOM(엑셀 한글 호환)을 씀
+            frame.to_csv(
+                self.filename,
+                mode='a' if self._csv_started else 'w',
+                header=not self._csv_started,
+                index=False,
+                encoding='utf-8' if self._csv_started else 'utf-8-sig'
+            )
+            self._csv_started = True
+        elif self.filename and self.file_format == 'parquet':
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.filename, table.schema)
+            self._parquet_writer.write_table(table)
+
+        if self.backend is not None:
+            # 한 번의 append_many = 한 번의 쓰기 요청 (쿼터는 SheetsWriter가 관리)
+            # 값 형식은 앱과 같이 RowEncoder가 정함 (숫자는 숫자로, 결측은 빈 칸)
+            records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+            values = [ENCODER.encode_record(record) for record in records]
+            for start in range(0, len(values), self.upload_batch):
+                self.backend.append_many(values[start:start + self.upload_batch])
+            self.uploaded += len(values)
+
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def prepare_storage(headers):
+    """저장소를 비우고 헤더를 씀 (실패 시 None)"""
+    backend = get_storage_backend()
+    if backend is None:
+        return None
+
+    try:
         # 기존 데이터 삭제
-        worksheet.clear()
+        backend.clear()
         print("기존 데이터 삭제 완료")
 
-        # 헤더 생성
-        headers = list(data[0].keys())
-        worksheet.append_row(headers)
+        backend.ensure_schema(headers)
         print(f"헤더 추가 완료: {len(headers)}개 컬럼")
-
-        # 데이터 추가
-        for row in data:
-            worksheet.append_row(list(row.values()))
-
-        print(f"✅ Google Sheets에 {len(data)}개 데이터 추가 완료")
-        return True
+        return backend
     except Exception as e:
-        print(f"❌ Google Sheets 저장 실패: {e}")
-        return False
+        print(f"❌ 저장소 준비 실패: {e}")
+        return None
 
-def save_to_csv(data, filename="simulation_results.csv"):
-    """CSV 파일로 저장"""
-    try:
-        headers = list(data[0].keys())
 
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(data)
+def simulation_headers():
+    """시뮬레이션 데이터의 컬럼 목록 (앱과 같은 sst_schema.HEADERS)"""
+    return list(HEADERS)
 
-        print(f"✅ CSV 파일 저장 완료: {filename}")
-        return True
-    except Exception as e:
-        print(f"❌ CSV 저장 실패: {e}")
-        return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 시뮬레이션 데이터 생성")
+    parser.add_argument("--rows", type=int, default=15, help="생성할 참가자 수")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드 (같은 시드면 같은 데이터)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="한 번에 생성/저장할 행 수")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--output", default=None, help="출력 파일 (기본: simulation_results.csv/.parquet)")
+    parser.add_argument("--no-upload", action="store_true", help="저장소(Google Sheets) 업로드 생략")
+    parser.add_argument("--upload-batch", type=int, default=500, help="append_rows 한 번에 올릴 행 수")
+    args = parser.parse_args()
+
+    output = args.output or f"simulation_results.{args.format}"
+
     print("=" * 50)
     print("SST 시뮬레이션 데이터 생성")
     print("=" * 50)
 
-    # 데이터 생성
-    print("\n1. 데이터 생성 중...")
-    data = generate_simulation_data()
-    print(f"   {len(data)}개의 시뮬레이션 데이터 생성 완료")
+    backend = None
+    if not args.no_upload:
+        print("\n1. 저장소 준비 중...")
+        backend = prepare_storage(simulation_headers())
 
-    # Google Sheets에 저장
-    print("\n2. Google Sheets에 저장 중...")
-    save_to_google_sheets(data)
+    print(f"\n2. {args.rows}개의 데이터 생성 및 저장 중...")
+    sink = SimulationSink(output, args.format, backend=backend, upload_batch=args.upload_batch)
+    try:
+        for frame in iter_simulation_chunks(args.rows, args.chunk_size, args.seed):
+            sink.write(frame)
+            print(f"   {sink.rows}/{args.rows}행 완료")
+    except Exception as e:
+        # 일부만 저장된 상태이므로 완료 메시지 없이 실패 상태로 종료
+        print(f"❌ 저장 실패: {e} (파일 {sink.rows}행, 저장소 {sink.uploaded}행까지 저장됨)")
+        sys.exit(1)
+    finally:
+        sink.close()
 
-    # CSV로 저장
-    print("\n3. CSV 파일로 저장 중...")
-    save_to_csv(data)
+    print(f"✅ {args.format.upper()} 파일 저장 완료: {output} ({sink.rows}행)")
+    if backend is not None:
+        print(f"✅ 저장소에 {sink.uploaded}개 데이터 추가 완료")
 
     print("\n" + "=" * 50)
     print("완료!")
@@ -0,0 +1,177 @@
+"""
+한국어 다중 키워드 매처 (Aho-Corasick)
+문항별 키워드 전체를 하나의 오토마톤으로 컴파일해 응답 한 건을 한 번의 선형 스캔으로 검사합니다.
+패턴 수와 무관하게 응답 길이에만 비례하므로 10만 행 이상의 일괄 채점에 씁니다.
+
+- text_cache.compact로 정규화한(공백을 지운) 텍스트에서 찾으므로 띄어쓰기 차이는 무시됩니다.
+- 키워드는 어간으로 적으면 뒤에 붙는 조사와 어미는 그대로 허용됩니다 ("제재소" → "제재소를").
+- 여러 단어로 된 키워드("석회암 기초")는 단어 사이에 조사가 끼어도 일치합니다 ("석회암의 기초").
+
+pyahocorasick이 설치되어 있으면 C 구현을 사용하고, 없으면 순수 파이썬 구현을 사용합니다.
+"""
+import unicodedata
+from collections import deque
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from text_cache import get_default_cache
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# 여러 단어로 된 키워드의 단어 사이에 올 수 있는 조사
+JOSA = ("", "의", "이", "가", "을", "를", "은", "는", "에", "로", "으로", "와", "과", "도")
+
+# 여러 응답을 이어 붙여 한 번에 처리할 때 쓰는 구분 문자 (정규화된 텍스트에는 남지 않음)
+_SEP = '\x00'
+
+
+def expand_term(term):
+    """키워드를 공백 없는 변형 목록으로 확장 (단어 사이 조사 허용)"""
+    words = unicodedata.normalize('NFC', term).split()
+    if len(words) <= 1:
+        return [''.join(words)]
+    variants = []
+    for josa in product(JOSA, repeat=len(words) - 1):
+        variants.append(''.join(w + j for w, j in zip(words, josa + ('',))))
+    return variants
+
+
+class _PythonAutomaton:
+    """순수 파이썬 Aho-Corasick 오토마톤"""
+
+    def __init__(self, words):
+        # words: {단어: 라벨 번호 튜플}
+        # 상태의 출력은 label_sets의 번호 (0은 출력 없음)
+        self.label_sets = [()]
+        interned = {(): 0}
+
+        def intern(labels):
+            labels = tuple(sorted(set(labels)))
+            if labels not in interned:
+                interned[labels] = len(self.label_sets)
+                self.label_sets.append(labels)
+            return interned[labels]
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]
+        for word, labels in words.items():
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(0)
+                state = nxt
+            self._output[state] = intern(self.label_sets[self._output[state]] + tuple(labels))
+
+        # 너비 우선으로 실패 링크를 만들고, 실패 경로의 출력을 합침
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                inherited = self._output[self._fail[nxt]]
+                if inherited:
+                    self._output[nxt] = intern(self.label_sets[self._output[nxt]] + self.label_sets[inherited])
+
+    def iter(self, text):
+        """일치할 때마다 (끝 위치, label_sets 번호) 반환"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                yield end, output[state]
+
+
+class _CAutomaton:
+    """pyahocorasick 기반 오토마톤 (실패 경로의 출력은 iter가 각각 반환)"""
+
+    def __init__(self, words):
+        self.label_sets = []
+        self._automaton = ahocorasick.Automaton()
+        for word, labels in words.items():
+            self._automaton.add_word(word, len(self.label_sets))
+            self.label_sets.append(tuple(labels))
+        self._automaton.make_automaton()
+
+    def iter(self, text):
+        return self._automaton.iter(text)
+
+
+class KeywordMatcher:
+    """라벨별 키워드 목록을 하나의 오토마톤으로 컴파일
+
+    keywords: {라벨: [키워드, ...]}
+    """
+
+    def __init__(self, keywords):
+        self.labels = list(keywords)
+        words = {}
+        for index, label in enumerate(self.labels):
+            for term in keywords[label]:
+                for variant in expand_term(term):
+                    if variant:
+                        words.setdefault(variant, set()).add(index)
+        words = {word: tuple(sorted(indexes)) for word, indexes in words.items()}
+        self._automaton = (_CAutomaton if AHOCORASICK_AVAILABLE else _PythonAutomaton)(words)
+
+    def match(self, text):
+        """정규화된 텍스트에서 일치한 라벨 집합"""
+        label_sets = self._automaton.label_sets
+        return {self.labels[i] for _, set_id in self._automaton.iter(text) for i in label_sets[set_id]}
+
+    def match_matrix(self, texts):
+        """정규화된 텍스트 목록 → (행 수, 라벨 수) bool 행렬
+
+        텍스트를 구분 문자로 이어 붙여 오토마톤을 한 번만 통과시키고,
+        일치 위치로 행을 찾습니다.
+        """
+        matrix = np.zeros((len(texts), len(self.labels)), dtype=bool)
+        matches = np.array(list(self._automaton.iter(_SEP.join(texts))), dtype=np.int64).reshape(-1, 2)
+        if not len(matches):
+            return matrix
+
+        # 이어 붙인 문자열의 위치 → 행 번호
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        rows = np.searchsorted(starts, matches[:, 0], side='right') - 1
+
+        # 라벨 집합 번호 → 라벨 번호들 (집합 크기만큼 행을 반복)
+        label_sets = self._automaton.label_sets
+        sizes = np.array([len(labels) for labels in label_sets], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        flat = np.array([i for labels in label_sets for i in labels], dtype=np.int64)
+        set_ids = matches[:, 1]
+        counts = sizes[set_ids]
+        positions = np.repeat(offsets[set_ids] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        matrix[np.repeat(rows, counts), flat[positions]] = True
+        return matrix
+
+
+def match_column(matcher, responses, text_cache=None):
+    """응답 열 전체를 정규화해 매칭 → (정규화된 텍스트 배열, bool 행렬)
+
+    같은 응답은 한 번만 정규화하고 스캔하며, 정규화 결과는 text_cache에 기억됩니다.
+    """
+    text_cache = text_cache or get_default_cache()
+    raw = pd.Series(responses, dtype=object).fillna('').astype(str)
+    codes, uniques = pd.factorize(raw.to_numpy(dtype=object))
+    texts = text_cache.compact_many(uniques.tolist())
+    return np.array(texts, dtype=object)[codes], matcher.match_matrix(texts)[codes]
@@ -0,0 +1,280 @@
+"""
+SST 동시 참가자 부하 테스트
+streamlit.testing의 AppTest로 N명의 가상 참가자가
+participant_info → instruction → story → pre_questions → questions(14문항) → complete
+전체 흐름을 진행하게 하고, 페이지 전환/저장 지연의 p50/p95/p99와 프로세스 CPU/메모리를 보고합니다.
+저장 지연은 쓰기 큐의 저장 1회(append_rows 호출)마다 기록된 값으로 따로 보고합니다.
+
+질문은 기본적으로 앱의 기본 경로인 브라우저 진행 컴포넌트로 진행합니다. 브라우저가 보내는 결과와 같은 값을
+컴포넌트 값으로 넣고 한 번 재실행합니다 (질문 사이에는 서버 재실행이 없으므로 생각 시간만 흐름).
+--server-form이면 대체 경로인 서버 폼으로 진행하는데, AppTest는 fragment만 다시 실행할 수 없으므로
+마지막을 뺀 질문 제출은 지연 통계에서 제외하고 횟수만 보고합니다.
+
+AppTest는 스레드 안전하지 않아 스크립트 실행은 하나의 잠금으로 직렬화합니다.
+Streamlit 서버도 한 프로세스의 모든 세션이 GIL을 공유하므로, 잠금 대기 시간이 곧
+동시 접속으로 생기는 대기열 지연입니다. 참가자의 생각 시간(--think-ms)은 잠금 밖에서 흐릅니다.
+
+기본 저장소는 가짜 Sheets 서버(fake_sheets)이고, 스풀은 임시 디렉터리를 사용합니다.
+
+    python load_test.py --participants 30 --think-ms 500
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parent / "sst_app.py"
+
+# AppTest의 전체 실행 중 st.rerun(scope="fragment")를 부르면 나오는 오류 문구
+FRAGMENT_RERUN_ERROR = 'scope="fragment" can only be specified'
+
+# 통계에서 제외한 단계 이름 표시
+UNMEASURED_NOTE = "AppTest는 fragment만 다시 실행할 수 없어 측정 제외"
+
+# 스크립트 실행 직렬화 잠금 (AppTest는 전역 Runtime을 교체하며 실행됨)
+_run_lock = threading.Lock()
+
+
+class FragmentRerunFilter(logging.Filter):
+    """서버 폼 진행 중 예상된 fragment 재실행 오류의 로그를 숨김 (다른 오류는 그대로 출력)"""
+
+    def filter(self, record):
+        error = record.exc_info[1] if record.exc_info else None
+        return not (error is not None and FRAGMENT_RERUN_ERROR in str(error))
+
+
+class SinkLatencyHandler(logging.Handler):
+    """쓰기 큐(write_queue)가 저장 1회마다 남기는 로그 레코드에서 지연(ms)과 행 수 수집"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.latencies = []
+        self.rows = []
+
+    def emit(self, record):
+        if hasattr(record, 'sink_ms'):
+            self.latencies.append(record.sink_ms)
+            self.rows.append(record.rows)
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    # nearest-rank: ceil(p/100 * n)번째 값 (1 ≤ 순위 ≤ n)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+class Participant:
+    """가상 참가자 한 명: 단계마다 스크립트 재실행 지연을 기록"""
+
+    def __init__(self, index, questions, storage_config, think_ms, seed, timings, unmeasured, server_form):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.questions = questions
+        self.think_ms = think_ms
+        self.random = random.Random(seed)
+        self.timings = timings
+        self.unmeasured = unmeasured
+        self.server_form = server_form
+        self.at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+        self.at.secrets['storage'] = storage_config
+
+    def _think(self):
+        if self.think_ms:
+            time.sleep(self.random.uniform(0.5, 1.5) * self.think_ms / 1000.0)
+
+    def step(self, name, action=None, fragment=False):
+        """action으로 위젯을 조작한 뒤 재실행 (잠금 대기 포함 지연 기록)
+
+        fragment: action이 st.fragment 안의 위젯을 조작하는 경우 (서버 폼 진행).
+        AppTest는 항상 스크립트 전체를 실행하므로 st.rerun(scope="fragment")가 오류로 끝납니다.
+        그 시점까지의 상태 변경은 반영되어 있으므로 다음 위젯을 그리기 위해 한 번 더 실행하되,
+        브라우저의 fragment 재실행과 다른 작업이므로 지연은 기록하지 않고 횟수만 셉니다.
+        """
+        self._think()
+        started = time.perf_counter()
+        measured = True
+        with _run_lock:
+            if action is not None:
+                action(self.at)
+            self.at.run()
+            if fragment and self.at.exception and FRAGMENT_RERUN_ERROR in self.at.exception[0].value:
+                self.at.run()
+                measured = False
+                self.unmeasured[name] += 1
+        if measured:
+            self.timings[name].append(time.perf_counter() - started)
+        if self.at.exception:
+            raise RuntimeError(f"참가자 {self.index} '{name}' 단계 오류: {self.at.exception[0].value}")
+
+    def run(self):
+        at = self.at
+        self.step('load')
+        self.step('participant_info→instruction', lambda at: (
+            at.text_input[0].input(f"LOAD{self.index:04d}"), at.button[0].click()))
+        self.step('instruction→story', lambda at: at.button[0].click())
+        self.step('story→pre_questions', lambda at: at.button[0].click())
+
+        # 사전 질문: 일부 참가자는 "예" 분기로 꼬리 질문까지 응답
+        read_before = "예" if self.random.random() < 0.2 else "아니오"
+        familiar = "예" if self.random.random() < 0.25 else "아니오"
+        self.step('pre_questions_input', lambda at: at.selectbox(key="read_before_select").select(read_before))
+        if read_before == "예":
+            self.step('pre_questions_input', lambda at: (
+                at.text_input(key="read_when_input").input("3년 전"),
+                at.text_input(key="read_memory_input").input("대략적인 줄거리만"),
+                at.selectbox(key="read_context_select").select("취미")))
+        self.step('pre_questions_input', lambda at: at.selectbox(key="familiar_select").select(familiar))
+        if familiar == "예":
+            self.step('pre_questions_input', lambda at: (
+                at.text_area(key="familiar_knowledge_input").input("제목만 들어봤습니다."),
+                at.text_area(key="familiar_discussion_input").input("없습니다.")))
+        self.step('pre_questions→questions', lambda at: at.button[0].click())
+
+        if self.server_form:
+            self.run_server_form()
+        else:
+            self.run_question_runner()
+
+        if at.session_state.page != 'complete':
+            raise RuntimeError(f"참가자 {self.index}가 완료 페이지에 도달하지 못했습니다: {at.session_state.page}")
+
+    def run_question_runner(self):
+        """브라우저 진행 컴포넌트: 질문 사이에는 서버 요청 없이 생각 시간만 흐르고, 끝에 결과를 한 번 전송"""
+        responses, times = {}, {}
+        now_ms = time.time() * 1000
+        for q in self.questions[:-1]:
+            started = time.perf_counter()
+            self._think()
+            submit_ms = max((time.perf_counter() - started) * 1000, 1.0)
+            responses[q['id']] = f"{q['id']}에 대한 가상 응답입니다."
+            times[q['id']] = {'shown_at': now_ms, 'submitted_at': now_ms + submit_ms,
+                              'first_input_ms': submit_ms / 2, 'submit_ms': submit_ms}
+            now_ms += submit_ms
+        last = self.questions[-1]['id']
+        responses[last] = f"{last}에 대한 가상 응답입니다."
+        # 마지막 질문의 생각 시간은 step 안에서 흐름
+        think_ms = self.think_ms or 1.0
+        times[last] = {'shown_at': now_ms, 'submitted_at': now_ms + think_ms,
+                       'first_input_ms': think_ms / 2, 'submit_ms': think_ms}
+        result = {'responses': responses, 'times': times}
+
+        def send_result(at):
+            # 컴포넌트의 setComponentValue와 같은 위젯 값 (키는 sst_app.render_question_runner)
+            at.session_state[f"question_runner_{at.session_state.runner_attempt}"] = result
+
+        self.step('questions→complete (save)', send_result)
+
+    def run_server_form(self):
+        """대체 경로(서버 폼): 질문마다 폼 제출, 마지막 제출은 완료 페이지 렌더링과 저장을 포함"""
+        for i, q in enumerate(self.questions):
+            name = 'questions→complete (save)' if i == len(self.questions) - 1 else 'question_submit'
+            self.step(name, lambda at, q=q: (
+                at.text_area(key=f"response_{q['id']}").input(f"{q['id']}에 대한 가상 응답입니다."),
+                at.button[0].click()), fragment=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SST 동시 참가자 부하 테스트")
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--think-ms", type=float, default=300, help="단계 사이 평균 생각 시간")
+    parser.add_argument("--backend", default="fake_sheets", help="저장소 종류 (fake_sheets, memory, sqlite, parquet)")
+    parser.add_argument("--latency-ms", type=float, default=200, help="fake_sheets 요청 지연")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server-form", action="store_true",
+                        help="질문을 대체 경로인 서버 폼으로 진행 (SST_CLIENT_RUNNER=0)")
+    args = parser.parse_args()
+
+    # 실제 스풀/저장소를 건드리지 않도록 임시 디렉터리 사용
+    workdir = tempfile.mkdtemp(prefix="sst_load_")
+    os.environ["SST_SPOOL_PATH"] = os.path.join(workdir, "spool.sqlite3")
+    os.environ["SST_CLIENT_RUNNER"] = "0" if args.server_form else "1"
+    if args.server_form:
+        logging.getLogger("streamlit.error_util").addFilter(FragmentRerunFilter())
+
+    # 쓰기 큐의 저장 1회 지연 수집
+    sink_latency = SinkLatencyHandler()
+    queue_logger = logging.getLogger("write_queue")
+    queue_logger.addHandler(sink_latency)
+    queue_logger.setLevel(logging.DEBUG)
+    storage_config = {
+        'backend': args.backend,
+        'path': os.path.join(workdir, "responses"),
+        'latency_ms': args.latency_ms,
+    }
+
+    sys.path.insert(0, str(APP_PATH.parent))
+    from sst_schema import QUESTIONS
+    from spool import SubmissionSpool
+
+    timings = defaultdict(list)
+    unmeasured = defaultdict(int)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    participants = [
+        Participant(i, QUESTIONS, storage_config, args.think_ms, args.seed * 100003 + i, timings,
+                    unmeasured, args.server_form)
+        for i in range(args.participants)
+    ]
+    errors = []
+    with ThreadPoolExecutor(max_workers=args.participants) as executor:
+        for future in [executor.submit(p.run) for p in participants]:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    wall_sessions = time.perf_counter() - wall_start
+
+    # 백그라운드 쓰기 큐가 스풀을 모두 비울 때까지 대기
+    spool = SubmissionSpool(os.environ["SST_SPOOL_PATH"])
+    drain_start = time.perf_counter()
+    while spool.pending_count() > 0 and time.perf_counter() - drain_start < 300:
+        time.sleep(0.1)
+    drain = time.perf_counter() - drain_start
+
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+    print("=" * 78)
+    mode = "서버 폼" if args.server_form else "브라우저 진행"
+    print(f"참가자 {args.participants}명, 저장소 {args.backend}, 질문 {mode}, 생각 시간 {args.think_ms}ms")
+    print("=" * 78)
+    print(f"{'단계':<32}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for name, values in timings.items():
+        ms = [v * 1000 for v in values]
+        print(f"{name:<32}{len(ms):>6}{percentile(ms, 50):>10.1f}{percentile(ms, 95):>10.1f}"
+              f"{percentile(ms, 99):>10.1f}{max(ms):>10.1f}")
+    if sink_latency.latencies:
+        ms = sink_latency.latencies
+        print(f"{'저장 1회 (append_rows)':<32}{len(ms):>6}{percentile(ms, 50):>10.1f}{percentile(ms, 95):>10.1f}"
+              f"{percentile(ms, 99):>10.1f}{max(ms):>10.1f}")
+    for name, count in unmeasured.items():
+        print(f"{name:<32}{count:>6}  ({UNMEASURED_NOTE})")
+    print("-" * 78)
+    if sink_latency.rows:
+        print(f"저장 1회당 행 수: 평균 {sum(sink_latency.rows) / len(sink_latency.rows):.1f}, "
+              f"최대 {max(sink_latency.rows)}")
+    print(f"세션 진행 시간: {wall_sessions:.2f}초, 저장소 업로드 대기: {drain:.2f}초 (미업로드 {spool.pending_count()}건)")
+    print(f"CPU 시간: {cpu:.2f}초 (평균 사용률 {cpu / wall * 100:.0f}%), 최대 RSS: {max_rss_mb:.1f}MB")
+    if errors:
+        print(f"오류 {len(errors)}건: {errors[0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+자발적 정신 상태 추론(S1) 판별
+요약 응답이 등장인물(닉, 마저리/마조리, 빌)에게 믿음, 욕구, 의도, 감정을 부여하는지 판별합니다.
+
+루브릭에 따라 다음은 정신 상태 추론으로 세지 않습니다.
+- 참가자 자신의 정신 상태: "나는 ~라고 생각해", "나는 알았어"
+- 이야기의 분위기: "슬픈 이별 이야기야"
+- 관계만 언급: "남자와 여자가 헤어지는 이야기야"
+
+어휘는 모듈을 읽을 때 정규식으로 한 번 컴파일되고, 응답 열 전체에 벡터 연산(pyarrow 문자열이
+있으면 RE2)으로 적용됩니다.
+
+    detect_many(frame['response_S1'])  # → (추론 여부, 검토 필요 여부)
+"""
+import hashlib
+
+import pandas as pd
+
+# 등장인물 언급 (이름과 3인칭 대명사)
+CHARACTERS = ("닉", "마저리", "마조리", "빌", "그녀", "그는", "그가", "그의", "그를", "두 사람", "둘 다", "둘은", "둘이")
+
+# 참가자 1인칭 표현
+FIRST_PERSON = ("나는", "나도", "내가", "저는", "저도", "제가", "내 생각", "제 생각")
+
+# 정신 상태 서술어 어간 (믿음/생각, 욕구/의도, 감정)
+MENTAL_PREDICATES = (
+    # 믿음, 생각, 앎
+    "생각", "믿", "알았", "알고", "알아차", "알게", "깨달", "눈치", "짐작", "예감", "의심", "확신",
+    "기억하", "오해", "착각",
+    # 욕구, 의도, 결정
+    "원하", "원했", "원치", "바라", "바랐", "싶어", "싶었", "싶지", "싶은", "의도", "작정", "결심", "결정",
+    "마음먹", "계획", "기대", "고민", "망설", "일부러", "려고 했", "려고 하", "려 했", "기로 했", "고자",
+    # 감정
+    "느끼", "느꼈", "느낀", "느낌", "감정", "기분", "마음이", "마음을", "사랑하", "사랑했", "사랑이 식",
+    "좋아하", "좋아했", "싫어", "싫증", "지루", "지겨", "질려", "질렸", "두려", "무서", "겁", "걱정",
+    "화가", "화나", "화났", "화를", "분노", "슬퍼", "슬펐", "슬픔", "짜증", "실망", "상처받", "상처를 받",
+    "서운", "속상", "후회", "미안", "죄책", "당황", "놀라", "놀랐", "외로", "괴로", "불편", "답답",
+    "혼란", "안도", "홀가분", "불안", "긴장", "행복", "불행",
+)
+
+# 이야기 전체의 분위기를 말하는 표현 ("슬픈 이별 이야기")
+MOOD_MODIFIERS = ("슬픈", "우울한", "씁쓸한", "안타까운", "쓸쓸한", "애틋한", "아련한", "가슴 아픈", "행복한")
+MOOD_NOUNS = ("이야기", "소설", "내용", "분위기", "결말", "장면", "이별", "사랑", "연애")
+
+# 인물 언급과 서술어 사이 최대 거리 (같은 문장 안에서)
+WINDOW_AFTER = 40     # "닉은 마저리와 헤어지기로 결심했다"
+WINDOW_BEFORE = 12    # "닉을 사랑하는 마저리"
+
+
+def _alternation(words):
+    # 띄어쓰기 차이를 허용하도록 공백은 선택적 공백으로
+    return '(?:' + '|'.join(w.replace(' ', r'\s?') for w in sorted(words, key=len, reverse=True)) + ')'
+
+
+_CHARACTER = _alternation(CHARACTERS)
+_PREDICATE = _alternation(MENTAL_PREDICATES)
+_FIRST_PERSON = _alternation(FIRST_PERSON)
+
+# 문장 경계를 넘지 않는 간격
+_GAP = r'[^.!?\n]'
+
+ATTRIBUTION_RE = (
+    f"{_CHARACTER}{_GAP}{{0,{WINDOW_AFTER}}}?{_PREDICATE}"
+    f"|{_PREDICATE}{_GAP}{{0,{WINDOW_BEFORE}}}?{_CHARACTER}"
+)
+# 1인칭 화자가 인용절을 받는 서술어 ("~라고 생각한다", "~다고 느꼈다")
+FRAME_RE = r'(?:다|라|이라)?고\s?(?:생각|느끼|느꼈|느낀|본다|봤|보았|여긴|여겼|판단)\S*'
+MOOD_RE = _alternation(MOOD_MODIFIERS) + r'\s?(?:\S+\s)?' + _alternation(MOOD_NOUNS)
+
+try:
+    _STRING_DTYPE = pd.StringDtype("pyarrow")
+    pd.Series([''], dtype=_STRING_DTYPE)
+except (ImportError, TypeError):
+    _STRING_DTYPE = object
+
+
+def _prepare(responses):
+    """NFC 정규화, 소문자, 공백 정리 (문장부호는 문장 경계로 남김)"""
+    texts = pd.Series(responses, dtype=object).fillna('').astype(str).astype(_STRING_DTYPE)
+    return texts.str.normalize('NFC').str.lower().str.replace(r'\s+', ' ', regex=True)
+
+
+def detect_many(responses):
+    """S1 응답 목록 판별 → (정신 상태 추론 여부, 검토 필요 여부) bool 배열
+
+    검토 필요: 1인칭 표현과 함께 추론이 발견된 경우(참가자 자신의 생각일 수 있음),
+    또는 정신 상태 서술어는 있지만 인물과 연결되지 않은 경우(주어 생략 가능)
+    """
+    texts = _prepare(responses)
+    first_person = texts.str.contains(_FIRST_PERSON, regex=True).to_numpy(dtype=bool)
+
+    # 분위기 표현 제거, 1인칭 화자의 인용 서술어 제거
+    cleaned = texts.str.replace(MOOD_RE, ' ', regex=True)
+    framed = cleaned.str.replace(FRAME_RE, ' ', regex=True)
+    cleaned = framed.where(pd.Series(first_person, index=texts.index), cleaned)
+
+    attributed = cleaned.str.contains(ATTRIBUTION_RE, regex=True).to_numpy(dtype=bool)
+    has_predicate = cleaned.str.contains(_PREDICATE, regex=True).to_numpy(dtype=bool)
+
+    review = (attributed & first_person) | (~attributed & has_predicate)
+    return attributed, review
+
+
+def fingerprint():
+    """판별 규칙 지문 (어휘나 규칙이 바뀌면 달라짐)"""
+    rules = '\n'.join((ATTRIBUTION_RE, FRAME_RE, MOOD_RE, _FIRST_PERSON, _PREDICATE))
+    return hashlib.sha1(rules.encode('utf-8')).hexdigest()
+
+
+def detect(text):
+    """응답 하나 판별 → (정신 상태 추론 여부, 검토 필요 여부)"""
+    attributed, review = detect_many([text])
+    return bool(attributed[0]), bool(review[0])
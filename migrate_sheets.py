@@ -0,0 +1,164 @@
+"""
+시트 스키마 마이그레이션
+sst_schema.HEADERS(질문 구성, 열 목록)가 바뀌었을 때 기존 시트의 열을 새 구성에 맞게 옮깁니다.
+reset_sheets.py처럼 데이터를 지우지 않고, 행마다 다시 쓰지도 않습니다.
+
+1. 시트 전체(채점 결과 열 포함)를 구간 단위로 읽어 로컬 스냅샷(csv.gz)으로 저장
+2. 열 삽입/이동/삭제를 spreadsheets.batchUpdate 한 번으로 적용 (셀 값은 서버에서 함께 이동)
+3. 1행 헤더를 새 구성으로 한 번에 기록 (새 열의 기존 행은 빈 칸)
+
+    python migrate_sheets.py --dry-run          # 변경 계획만 출력
+    python migrate_sheets.py                    # 스냅샷 후 마이그레이션
+    python migrate_sheets.py --drop-removed     # 새 구성에 없는 열도 삭제
+"""
+import argparse
+import csv
+import gzip
+from datetime import datetime
+from pathlib import Path
+
+import sheets_client
+from sst_schema import GOOGLE_SHEETS_NAME, HEADERS, SCHEMA_VERSION
+from storage import SheetsBackend, StorageError, load_local_secrets, open_backend
+
+try:
+    from gspread.utils import rowcol_to_a1
+    GSPREAD_AVAILABLE = True
+except ImportError:
+    GSPREAD_AVAILABLE = False
+
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "data" / "snapshots"
+
+
+class MigrationError(Exception):
+    """마이그레이션 계획을 세울 수 없을 때 발생 (예: 삭제가 필요한데 --drop-removed 없음)"""
+
+
+def plan_migration(current, target, drop_removed=False):
+    """현재 헤더 → 목표 헤더로 바꾸는 열 연산 목록
+
+    연산은 앞에서부터 차례로 적용하며 열 번호는 적용 직전 기준입니다.
+    ('delete', 열 번호, 이름), ('move', 원래 열 번호, 새 열 번호, 이름), ('insert', 열 번호, 이름)
+    """
+    duplicates = sorted({name for name in current if current.count(name) > 1})
+    if duplicates:
+        raise MigrationError(f"시트 헤더에 중복된 열이 있습니다: {duplicates}")
+
+    ops = []
+    columns = list(current)
+    removed = [name for name in columns if name not in target]
+    if removed and not drop_removed:
+        raise MigrationError(
+            f"새 구성에 없는 열이 있습니다: {removed} (스냅샷 후 삭제하려면 --drop-removed)"
+        )
+    # 삭제는 오른쪽부터 (앞 열 번호가 바뀌지 않도록)
+    for index in reversed(range(len(columns))):
+        if columns[index] not in target:
+            ops.append(('delete', index, columns.pop(index)))
+
+    for index, name in enumerate(target):
+        if index < len(columns) and columns[index] == name:
+            continue
+        if name in columns:
+            source = columns.index(name)
+            ops.append(('move', source, index, name))
+            columns.insert(index, columns.pop(source))
+        else:
+            ops.append(('insert', index, name))
+            columns.insert(index, name)
+    return ops
+
+
+def _dimension_requests(sheet_id, ops):
+    """열 연산 → spreadsheets.batchUpdate 요청 목록"""
+
+    def columns(start, end):
+        return {'sheetId': sheet_id, 'dimension': 'COLUMNS', 'startIndex': start, 'endIndex': end}
+
+    requests = []
+    for op in ops:
+        if op[0] == 'delete':
+            requests.append({'deleteDimension': {'range': columns(op[1], op[1] + 1)}})
+        elif op[0] == 'move':
+            # 왼쪽으로만 옮기므로 destinationIndex가 그대로 새 열 번호
+            requests.append({'moveDimension': {'source': columns(op[1], op[1] + 1), 'destinationIndex': op[2]}})
+        else:
+            requests.append({'insertDimension': {'range': columns(op[1], op[1] + 1), 'inheritFromBefore': False}})
+    return requests
+
+
+def _column_letter(col):
+    return rowcol_to_a1(1, col).rstrip('0123456789')
+
+
+def take_snapshot(backend, directory=SNAPSHOT_DIR, page_size=5000):
+    """시트 전체(헤더와 채점 결과 열 포함)를 page_size행씩 읽어 csv.gz로 저장 → (경로, 데이터 행 수)"""
+    worksheet = backend.worksheet
+    header = backend.writer.row_values(worksheet, 1)
+    last_col = _column_letter(max(1, len(header)))
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{backend.spreadsheet_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv.gz"
+
+    rows = 0
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+        out = csv.writer(f)
+        out.writerow(header)
+        while True:
+            # 시트의 1행은 헤더, 데이터 행 rows는 시트의 rows + 2행
+            cell_range = f"A{rows + 2}:{last_col}{rows + page_size + 1}"
+            values = backend.writer.call(worksheet.get, cell_range, kind='read')
+            out.writerows(list(row) + [''] * (len(header) - len(row)) for row in values)
+            rows += len(values)
+            if len(values) < page_size:
+                break
+    return path, rows
+
+
+def migrate(backend, target=None, drop_removed=False, dry_run=False, snapshot_dir=SNAPSHOT_DIR, log=print):
+    """시트의 응답 열을 target(기본 sst_schema.HEADERS) 구성으로 바꾸고 적용한 열 연산 목록 반환"""
+    if not isinstance(backend, SheetsBackend):
+        raise StorageError("마이그레이션은 Google Sheets 저장소에서만 지원합니다.")
+    target = list(target or HEADERS)
+    current = backend.read_headers()
+    if not current:
+        log("시트가 비어 있습니다. 앱이 첫 저장 때 헤더를 만듭니다.")
+        return []
+
+    ops = plan_migration(current, target, drop_removed=drop_removed)
+    if not ops:
+        log(f"시트 헤더가 이미 현재 스키마(v{SCHEMA_VERSION})와 같습니다.")
+        return []
+    for op in ops:
+        log(f"   {op[0]}: {op[-1]}")
+    if dry_run:
+        return ops
+
+    path, rows = take_snapshot(backend, snapshot_dir)
+    log(f"스냅샷 저장: {path} ({rows}행)")
+
+    worksheet = backend.worksheet
+    backend.writer.call(worksheet.spreadsheet.batch_update, {'requests': _dimension_requests(worksheet.id, ops)})
+    backend.writer.call(
+        worksheet.batch_update, [{'range': f"A1:{_column_letter(len(target))}1", 'values': [target]}]
+    )
+
+    # 헤더 확인 캐시와 백엔드의 헤더 캐시 폐기
+    sheets_client.invalidate(backend.spreadsheet_name)
+    backend._headers = None
+    log(f"마이그레이션 완료: 열 연산 {len(ops)}개, 스키마 v{SCHEMA_VERSION}")
+    return ops
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 시트 스키마 마이그레이션")
+    parser.add_argument("--dry-run", action="store_true", help="변경 계획만 출력")
+    parser.add_argument("--drop-removed", action="store_true", help="새 구성에 없는 열 삭제 (스냅샷에는 남음)")
+    parser.add_argument("--snapshot-dir", default=str(SNAPSHOT_DIR), help="스냅샷 저장 디렉터리")
+    args = parser.parse_args()
+
+    backend = open_backend(load_local_secrets(), GOOGLE_SHEETS_NAME)
+    try:
+        migrate(backend, drop_removed=args.drop_removed, dry_run=args.dry_run, snapshot_dir=args.snapshot_dir)
+    except MigrationError as e:
+        raise SystemExit(f"❌ {e}")
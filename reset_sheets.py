@@ -1,87 +1,108 @@
 """
 Google Sheets 초기화 스크립트
-헤더만 생성하고 기존 데이터는 모두 삭제합니다.
-"""
-import toml
-from google.oauth2.service_account import Credentials
-import gspread
-
-# Google Sheets 설정
-GOOGLE_SHEETS_NAME = "SST_Responses"
-
-# 질문 목록 (sst_app.py와 동일)
-QUESTIONS = [
-    {"id": "S1", "type": "spontaneous"},
-    {"id": "C1", "type": "comprehension"},
-    {"id": "C2", "type": "comprehension"},
-    {"id": "C3", "type": "comprehension"},
-    {"id": "C4", "type": "comprehension"},
-    {"id": "M1", "type": "mental_state"},
-    {"id": "M2", "type": "mental_state"},
-    {"id": "M3", "type": "mental_state"},
-    {"id": "M4", "type": "mental_state"},
-    {"id": "M5", "type": "mental_state"},
-    {"id": "M6", "type": "mental_state"},
-    {"id": "M7", "type": "mental_state"},
-    {"id": "M8", "type": "mental_state"},
-    {"id": "C5", "type": "comprehension"},
-]
-
-def get_google_sheets_client():
-    """Google Sheets 클라이언트 생성"""
-    try:
-        # .streamlit/secrets.toml 읽기
-        with open('.streamlit/secrets.toml', 'r') as f:
-            secrets = toml.load(f)
+현재 시트의 응답 행을 보관한 뒤 헤더만 남은 빈 시트로 되돌립니다.
+
+- sheet (기본): 같은 스프레드시트에 archive_<시각> 워크시트로 서버에서 복사
+- parquet: data/archive/rotated_at=<시각>/ 아래에 zstd 압축 Parquet로 저장
+- none: 보관하지 않고 모두 삭제 (이전 동작, --yes 필요)
 
-        credentials_dict = secrets["gcp_service_account"]
+보관한 행 수만큼만 서버에서 한 번에 삭제하므로, 보관 중에 새로 들어온 응답은 라이브 시트에 남습니다.
 
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
+    python reset_sheets.py                    # 워크시트로 보관 후 초기화
+    python reset_sheets.py --archive parquet  # 로컬 Parquet로 보관 후 초기화
+"""
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import sheets_client
+from sst_schema import GOOGLE_SHEETS_NAME, HEADERS
+from storage import SheetsBackend, load_local_secrets, open_backend
 
-        credentials = Credentials.from_service_account_info(
-            credentials_dict,
-            scopes=scopes
-        )
+# 로컬 Parquet 보관 디렉터리
+ARCHIVE_DIR = Path(__file__).resolve().parent / "data" / "archive"
 
-        client = gspread.authorize(credentials)
-        return client
+def get_storage_backend():
+    """저장소 백엔드 생성 (.streamlit/secrets.toml 설정, 기본은 Google Sheets)"""
+    try:
+        return open_backend(load_local_secrets(), GOOGLE_SHEETS_NAME)
     except Exception as e:
-        print(f"Google Sheets 연결 실패: {e}")
+        print(f"저장소 연결 실패: {e}")
         return None
 
-def reset_spreadsheet():
-    """스프레드시트 초기화"""
-    client = get_google_sheets_client()
+def archive_to_sheet(backend, stamp):
+    """라이브 시트를 archive_<stamp> 워크시트로 서버에서 복사하고 복사된 데이터 행 수 반환"""
+    worksheet = backend.worksheet
+    archive = backend.writer.call(
+        worksheet.spreadsheet.duplicate_sheet, worksheet.id, new_sheet_name=f"archive_{stamp}"
+    )
+    print(f"워크시트로 보관: archive_{stamp}")
+    # 복사본의 A열(timestamp)만 읽어 행 수 확인
+    return len(backend.writer.call(archive.get, 'A2:A', kind='read'))
+
+def archive_to_parquet(backend, stamp, directory=ARCHIVE_DIR):
+    """라이브 시트의 행 전체(채점 결과 열 포함)를 zstd 압축 Parquet로 저장하고 저장한 행 수 반환
+
+    보관한 행은 라이브 시트에서 삭제되므로 score_pipeline.py가 쓴 점수 열도 함께 보관합니다 (sheet 보관과 같은 폭).
+    """
+    from export_sheets import export
+
+    output = Path(directory) / f"rotated_at={stamp}"
+    rows = export(backend, output, compression='zstd', log=lambda message: None, include_derived=True)
+    print(f"Parquet로 보관: {output}")
+    return rows
+
+def delete_data_rows(backend, rows):
+    """헤더 아래 데이터 행 rows개를 batchUpdate 한 번으로 삭제"""
+    if rows <= 0:
+        return
+    worksheet = backend.worksheet
+    backend.writer.call(worksheet.spreadsheet.batch_update, {'requests': [{
+        'deleteDimension': {
+            'range': {'sheetId': worksheet.id, 'dimension': 'ROWS', 'startIndex': 1, 'endIndex': 1 + rows}
+        }
+    }]})
+
+def rotate_spreadsheet(backend, archive='sheet'):
+    """응답 행을 보관한 뒤 라이브 시트에서 삭제하고 보관한 행 수 반환 (헤더가 현재 스키마와 다르면 비움)"""
+    if not isinstance(backend, SheetsBackend):
+        raise ValueError("보관 후 초기화는 Google Sheets 저장소에서만 지원합니다. (--archive none 사용)")
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if archive == 'sheet':
+        rows = archive_to_sheet(backend, stamp)
+    else:
+        rows = archive_to_parquet(backend, stamp)
+
+    delete_data_rows(backend, rows)
+    print(f"라이브 시트에서 {rows}행 삭제")
+
+    header = sheets_client.data_headers(backend.writer.row_values(backend.worksheet, 1))
+    if header != HEADERS and len(backend.read_range(0, 1)) == 0:
+        # 비어 있는 시트이므로 헤더만 새 구성으로 교체
+        backend.clear()
+    return rows
 
-    if client is None:
+def reset_spreadsheet(archive='sheet'):
+    """스프레드시트 초기화 (archive: sheet | parquet | none)"""
+    backend = get_storage_backend()
+
+    if backend is None:
         print("클라이언트 생성 실패")
         return False
 
     try:
-        # 스프레드시트 열기
-        spreadsheet = client.open(GOOGLE_SHEETS_NAME)
-        worksheet = spreadsheet.sheet1
-
-        # 모든 데이터 삭제
-        worksheet.clear()
-        print("기존 데이터 삭제 완료")
-
-        # 헤더 생성
-        headers = [
-            'timestamp', 'participant_id', 'age', 'gender', 'education',
-            'story_read_time_sec', 'total_time_sec',
-            'read_before', 'read_when', 'read_memory', 'read_context',
-            'read_grade', 'read_class', 'familiar', 'familiar_knowledge',
-            'familiar_discussion'
-        ]
-        for q in QUESTIONS:
-            headers.append(f"response_{q['id']}")
+        if archive == 'none':
+            # 모든 데이터 삭제
+            backend.clear()
+            print("기존 데이터 삭제 완료")
+        else:
+            rotate_spreadsheet(backend, archive)
+
+        # 헤더 생성 (sst_schema.HEADERS, 앱과 같은 열 구성)
+        headers = list(HEADERS)
 
         # 헤더 추가
-        worksheet.append_row(headers)
+        backend.ensure_schema(headers)
         print(f"헤더 생성 완료: {len(headers)}개 컬럼")
         print(f"헤더: {headers[:5]}... (총 {len(headers)}개)")
 
@@ -92,8 +113,16 @@ def reset_spreadsheet():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 시트 초기화 (응답 보관 후)")
+    parser.add_argument("--archive", choices=["sheet", "parquet", "none"], default="sheet",
+                        help="응답 보관 방식 (none은 보관 없이 삭제)")
+    parser.add_argument("--yes", action="store_true", help="--archive none 확인")
+    args = parser.parse_args()
+    if args.archive == 'none' and not args.yes:
+        raise SystemExit("보관 없이 모든 응답을 삭제하려면 --yes를 함께 주세요.")
+
     print("Google Sheets 초기화 시작...")
-    success = reset_spreadsheet()
+    success = reset_spreadsheet(args.archive)
     if success:
         print("✅ 초기화 완료!")
     else:
@@ -0,0 +1,316 @@
+"""
+증분 채점 파이프라인
+저장소(SST_Responses 시트 등)의 응답을 채점하고 결과를 로컬 SQLite 상태 파일에 쌓습니다.
+다시 실행하면 지난번 워터마크(채점한 행 수) 이후에 추가된 행만 읽어 채점하므로
+매일 밤 재채점 비용은 전체 기록이 아니라 새 데이터 양에 비례합니다.
+
+- 행마다 내용 해시를 저장하고, 워터마크 직전 행의 해시가 달라졌으면(시트 초기화/정렬 변경)
+  상태를 버리고 처음부터 다시 채점합니다.
+- 문항별 채점 규칙 지문(RubricScorer.item_fingerprints)이 바뀐 문항만 기존 행 전체를 다시 채점합니다.
+- --write-back을 주면 점수가 바뀐 행만 응답 열 바로 뒤의 점수 열(SCORE_COLUMNS)에 되돌려 씁니다.
+  연속한 행 구간을 범위 하나로 묶어 batch_update 한 번에 보내므로 5,000명을 채점해도 API 호출은 몇 번입니다.
+
+    python score_pipeline.py --output scored.csv
+    python score_pipeline.py --write-back
+"""
+import argparse
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from scoring import RUBRIC_ITEMS, SCORE_COLUMNS, RubricScorer
+from sst_schema import GOOGLE_SHEETS_NAME
+from storage import load_local_secrets, open_backend
+from text_cache import TextCache
+
+SCORE_STATE_PATH = Path(__file__).resolve().parent / "data" / "scores.sqlite3"
+
+# 행을 식별하는 열 (있으면 상태 파일에 함께 저장)
+ID_COLUMNS = ("timestamp", "participant_id")
+
+
+def row_hash(row):
+    """행 내용 해시 (행이 바뀌었는지 확인용)"""
+    return hashlib.sha1('\x1f'.join('' if v is None else str(v) for v in row).encode('utf-8')).hexdigest()
+
+
+class ScoreStore:
+    """채점 상태 파일: 채점한 행(해시, 식별 열), 문항별 점수, 문항별 규칙 지문"""
+
+    def __init__(self, path=SCORE_STATE_PATH):
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scored_rows (
+                row_index INTEGER PRIMARY KEY,
+                row_hash TEXT NOT NULL,
+                timestamp TEXT,
+                participant_id TEXT,
+                scored_at TEXT NOT NULL,
+                written_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS item_scores (
+                row_index INTEGER NOT NULL,
+                qid TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                review TEXT NOT NULL,
+                PRIMARY KEY (row_index, qid)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS item_rules (
+                qid TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL
+            );
+        """)
+        # 시트에 점수를 되돌려 쓴 시각 (NULL이면 쓰기 대기) - 이전 버전 상태 파일에는 컬럼 추가
+        columns = [info[1] for info in self._conn.execute("PRAGMA table_info(scored_rows)")]
+        if 'written_at' not in columns:
+            self._conn.execute("ALTER TABLE scored_rows ADD COLUMN written_at TEXT")
+
+    def watermark(self):
+        """(채점한 행 수, 마지막 행의 timestamp)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT row_index, timestamp FROM scored_rows ORDER BY row_index DESC LIMIT 1"
+            ).fetchone()
+        return (0, None) if row is None else (row[0] + 1, row[1])
+
+    def row_hash_at(self, row_index):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT row_hash FROM scored_rows WHERE row_index = ?", (row_index,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def item_fingerprints(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT qid, fingerprint FROM item_rules"))
+
+    def set_item_fingerprints(self, fingerprints):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO item_rules (qid, fingerprint) VALUES (?, ?)", fingerprints.items()
+            )
+            self._conn.execute("COMMIT")
+
+    def save(self, start, scored, items, rows=None, ids=None):
+        """행 start부터의 채점 결과 저장 (한 트랜잭션)
+
+        rows/ids가 있으면 새로 채점한 행으로 기록하고, 없으면 기존 행의 items 점수만 갱신합니다.
+        어느 쪽이든 해당 행은 시트 쓰기 대기 상태가 됩니다.
+        """
+        indexes = range(start, start + len(scored))
+        score_rows = [
+            (row_index, qid, int(score), review or '')
+            for qid in items
+            for row_index, score, review in zip(indexes, scored[f"score_{qid}"], scored[f"review_{qid}"])
+        ]
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute("BEGIN")
+            if rows is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scored_rows (row_index, row_hash, timestamp, participant_id, scored_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(i, row_hash(row), id_row[0], id_row[1], now) for i, row, id_row in zip(indexes, rows, ids)]
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE scored_rows SET written_at = NULL WHERE row_index >= ? AND row_index < ?",
+                    (indexes.start, indexes.stop)
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO item_scores (row_index, qid, score, review) VALUES (?, ?, ?, ?)",
+                score_rows
+            )
+            self._conn.execute("COMMIT")
+
+    def unwritten_rows(self):
+        """점수를 시트에 아직 쓰지 않은 행 번호 (오름차순)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT row_index FROM scored_rows WHERE written_at IS NULL ORDER BY row_index"
+            )]
+
+    def mark_written(self, ranges):
+        """[(start, stop), ...] 행 구간을 시트에 쓴 것으로 기록"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE scored_rows SET written_at = ? WHERE row_index >= ? AND row_index < ?",
+                [(now, start, stop) for start, stop in ranges]
+            )
+            self._conn.execute("COMMIT")
+
+    def reset(self):
+        """채점 상태 전체 삭제"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM scored_rows")
+            self._conn.execute("DELETE FROM item_scores")
+            self._conn.execute("DELETE FROM item_rules")
+            self._conn.execute("COMMIT")
+
+    def frame(self, start=0, stop=None):
+        """저장된 점수를 행 단위 DataFrame으로 (row_index, 식별 열, score_<QID>, review_<QID>)"""
+        stop = stop if stop is not None else self.watermark()[0]
+        with self._lock:
+            rows = pd.read_sql_query(
+                "SELECT row_index, timestamp, participant_id FROM scored_rows"
+                " WHERE row_index >= ? AND row_index < ? ORDER BY row_index",
+                self._conn, params=(start, stop)
+            )
+            scores = pd.read_sql_query(
+                "SELECT row_index, qid, score, review FROM item_scores WHERE row_index >= ? AND row_index < ?",
+                self._conn, params=(start, stop)
+            )
+        wide = scores.pivot(index='row_index', columns='qid', values=['score', 'review'])
+        result = rows.set_index('row_index')
+        for qid in RUBRIC_ITEMS:
+            result[f"score_{qid}"] = wide[('score', qid)] if ('score', qid) in wide else 0
+            result[f"review_{qid}"] = wide[('review', qid)] if ('review', qid) in wide else ''
+        return result.reset_index()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _read_chunks(backend, headers, start, stop=None, chunk_size=1000):
+    """[start, stop) 행을 chunk_size개씩 (시작 행, 원본 행 목록, DataFrame)으로 반환"""
+    width = len(headers)
+    while stop is None or start < stop:
+        end = start + chunk_size if stop is None else min(start + chunk_size, stop)
+        rows = [(list(row) + [''] * width)[:width] for row in backend.read_range(start, end)]
+        if not rows:
+            return
+        yield start, rows, pd.DataFrame(rows, columns=headers)
+        if len(rows) < end - start:
+            return
+        start += len(rows)
+
+
+def run_incremental(backend, scorer, store, chunk_size=1000, log=print):
+    """새로 추가된 행과 규칙이 바뀐 문항만 채점하고 통계 반환"""
+    stats = {'new_rows': 0, 'rescored_rows': 0, 'rescored_items': [], 'reset': False}
+    headers = backend.read_headers()
+    if not headers:
+        log("저장소가 비어 있습니다.")
+        return stats
+
+    # 워터마크 검증: 마지막으로 채점한 행이 그대로인지 확인
+    scored_rows, _ = store.watermark()
+    if scored_rows:
+        last = backend.read_range(scored_rows - 1, scored_rows)
+        width = len(headers)
+        if not last or row_hash((list(last[0]) + [''] * width)[:width]) != store.row_hash_at(scored_rows - 1):
+            log("저장소 내용이 바뀌어 처음부터 다시 채점합니다.")
+            store.reset()
+            scored_rows = 0
+            stats['reset'] = True
+
+    # 규칙이 바뀐 문항만 기존 행 재채점
+    fingerprints = scorer.item_fingerprints()
+    stored = store.item_fingerprints()
+    stale = [qid for qid in RUBRIC_ITEMS if stored.get(qid) != fingerprints[qid]]
+    if scored_rows and stale:
+        log(f"규칙이 바뀐 문항 재채점: {', '.join(stale)} ({scored_rows}행)")
+        for start, _, frame in _read_chunks(backend, headers, 0, scored_rows, chunk_size):
+            store.save(start, scorer.score_frame(frame, items=stale), stale)
+            stats['rescored_rows'] += len(frame)
+        stats['rescored_items'] = stale
+    store.set_item_fingerprints(fingerprints)
+
+    # 워터마크 이후 새 행 채점 (청크마다 저장하므로 중단되어도 이어서 진행)
+    id_indexes = [headers.index(c) if c in headers else None for c in ID_COLUMNS]
+    for start, rows, frame in _read_chunks(backend, headers, scored_rows, None, chunk_size):
+        ids = [tuple(row[i] if i is not None else None for i in id_indexes) for row in rows]
+        store.save(start, scorer.score_frame(frame, items=RUBRIC_ITEMS), RUBRIC_ITEMS, rows=rows, ids=ids)
+        stats['new_rows'] += len(frame)
+        log(f"   {start + len(frame)}행까지 채점")
+    return stats
+
+
+def _row_runs(indexes, chunk_size):
+    """오름차순 행 번호를 연속 구간으로 묶고, 구간들을 합계 chunk_size행 이하의 묶음으로 나눔
+
+    → [[(start, stop), ...], ...]
+    """
+    runs = []
+    for index in indexes:
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+
+    batch, size = [], 0
+    for start, stop in runs:
+        while start < stop:
+            end = min(stop, start + chunk_size - size)
+            batch.append((start, end))
+            size += end - start
+            start = end
+            if size == chunk_size:
+                yield batch
+                batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def write_back(backend, scorer, store, chunk_size=5000, log=print):
+    """점수가 바뀐 행의 점수 블록을 응답 열 뒤에 기록하고 통계 반환
+
+    chunk_size행마다 backend.write_columns를 한 번 호출하며(Sheets에서는 batch_update 한 번),
+    호출은 저장소의 SheetsWriter를 거치므로 쓰기 쿼터를 지킵니다.
+    기록이 끝난 묶음만 완료로 표시하므로 중간에 실패해도 다음 실행에서 이어서 씁니다.
+    """
+    stats = {'written_rows': 0, 'requests': 0}
+    for batch in _row_runs(store.unwritten_rows(), chunk_size):
+        blocks = []
+        for start, stop in batch:
+            scored = scorer.add_totals(store.frame(start, stop))
+            blocks.append((start, scored[SCORE_COLUMNS].astype(int).to_numpy().tolist()))
+        backend.write_columns(SCORE_COLUMNS, blocks)
+        store.mark_written(batch)
+        stats['requests'] += 1
+        stats['written_rows'] += sum(stop - start for start, stop in batch)
+        log(f"   점수 {stats['written_rows']}행 기록")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 증분 채점")
+    parser.add_argument("--state", default=str(SCORE_STATE_PATH), help="채점 상태 파일")
+    parser.add_argument("--output", default=None, help="전체 채점 결과를 저장할 CSV (선택)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="한 번에 읽어 채점할 행 수")
+    parser.add_argument("--text-cache", default=None, help="정규화 결과 디스크 캐시 (선택)")
+    parser.add_argument("--write-back", action="store_true", help="점수를 응답 열 뒤에 되돌려 씀")
+    parser.add_argument("--write-chunk-size", type=int, default=5000, help="쓰기 요청 한 번에 담을 행 수")
+    args = parser.parse_args()
+
+    backend = open_backend(load_local_secrets(), GOOGLE_SHEETS_NAME)
+    scorer = RubricScorer(text_cache=TextCache(path=args.text_cache) if args.text_cache else None)
+    store = ScoreStore(args.state)
+
+    stats = run_incremental(backend, scorer, store, chunk_size=args.chunk_size)
+    total, last_timestamp = store.watermark()
+    print(f"새 행 {stats['new_rows']}개 채점, 재채점 {stats['rescored_rows']}행 "
+          f"({', '.join(stats['rescored_items']) or '없음'}), 전체 {total}행 (마지막 {last_timestamp})")
+
+    if args.write_back:
+        written = write_back(backend, scorer, store, chunk_size=args.write_chunk_size)
+        print(f"점수 {written['written_rows']}행 기록 (쓰기 요청 {written['requests']}번)")
+
+    if args.output:
+        result = scorer.add_totals(store.frame())
+        result.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"저장: {args.output}")
+    store.close()
@@ -0,0 +1,427 @@
+"""
+SST 자동 채점
+단편소설과제_평가루브릭_한국어.txt의 0/1/2점 루브릭을 문항별 규칙으로 읽어 들이고,
+응답 전체를 한 번에 임시 채점합니다. 규칙으로 확정할 수 없는 응답은 "검토 필요"로
+표시하므로 채점자는 그 응답만 확인하면 됩니다.
+
+채점 규칙 (루브릭 일반 지침):
+- 1점과 2점에 모두 해당하면 2점 (높은 점수 우선)
+- 명백히 틀린("망친") 응답은 0점 (단, 다른 점수 패턴도 함께 있으면 철회 여부를 사람이 확인)
+
+S1(자발적 정신 상태 추론)은 키워드 규칙 대신 mental_state의 판별기로 채점합니다.
+
+    python scoring.py simulation_results.csv --output scored.csv
+"""
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import mental_state
+from keyword_matcher import KeywordMatcher, match_column
+from sst_schema import QUESTION_IDS
+from text_cache import NORMALIZER_VERSION, TextCache
+
+RUBRIC_PATH = Path(__file__).resolve().parent / "단편소설과제_평가루브릭_한국어.txt"
+
+# 루브릭의 문항 번호(1~14) 순서대로 대응하는 문항 id (sst_schema.QUESTIONS 순서와 같음)
+RUBRIC_ITEMS = list(QUESTION_IDS)
+
+# 루브릭 제목의 영역 이름 → sst_schema.QUESTIONS의 type
+CATEGORIES = {
+    "자발적 정신 상태 추론": "spontaneous",
+    "이해력": "comprehension",
+    "명시적 정신 상태 추론": "mental_state",
+}
+
+# 시트에 되돌려 쓰는 점수 열 (문항별 점수, 영역별 점수, 총점, 검토 필요 문항 수)
+SCORE_COLUMNS = (
+    [f"score_{qid}" for qid in RUBRIC_ITEMS]
+    + [f"score_{category}" for category in CATEGORIES.values()]
+    + ["score_total", "review_count"]
+)
+
+# 검토 필요 사유
+REASON_NO_MATCH = "no_match"            # 어떤 점수 패턴에도 해당하지 않음
+REASON_BOTCHED_CONFLICT = "botched"     # 망친 응답 패턴과 점수 패턴이 함께 있음 (철회 여부 확인)
+REASON_DETECTOR = "detector"            # 전용 판별기가 확신하지 못함 (1인칭 표현, 인물 없는 서술어)
+
+# 키워드 규칙 대신 전용 판별기로 채점하는 문항: 응답 목록 → (점수 조건 bool 배열, 검토 필요 bool 배열)
+DETECTORS = {
+    "S1": mental_state.detect_many,
+}
+DETECTOR_FINGERPRINTS = {
+    "S1": mental_state.fingerprint,
+}
+
+# 문항별 키워드 패턴 (DETECTORS에 있는 문항 제외)
+# 패턴 하나는 단어 묶음의 튜플이고, 모든 묶음에서 하나 이상의 단어가 나와야 일치합니다.
+# 단어는 어간으로 적으며(뒤따르는 조사/어미 허용), 띄어 쓴 단어 사이에는 조사가 끼어도 일치합니다
+# ("석회암 기초" → "석회암기초", "석회암의 기초"). 문항별 규칙은 keyword_matcher로 한 번에 컴파일됩니다.
+_NEG_EMOTION = ("화가", "화나", "화난", "분노", "슬프", "슬픔", "슬퍼", "짜증", "실망", "상처",
+                "괴로", "우울", "비참", "서운", "속상", "충격")
+_BREAKUP = ("헤어", "이별", "끝내", "끝났", "끝이", "끝을", "관계 정리")
+
+KEYWORDS = {
+    "C1": {
+        2: [
+            (("제재소", "목재소", "제재공장", "방앗간"),
+             ("버려", "버린", "폐허", "오래", "낡", "부서", "무너", "흰", "하얀", "석회", "기초", "흔적", "잔해")),
+            (("석회암 기초",),),
+            (("마을",), ("버려", "버린", "폐허", "벌목", "사라", "텅", "쇠퇴")),
+            (("호튼",),),
+        ],
+        1: [
+            (("제재소", "목재소", "공장", "방앗간"),),
+            (("습지", "초원", "늪", "갈대", "풀", "해안", "숲", "나무", "모래", "바위", "물가"),),
+        ],
+        "botched": [],
+    },
+    "C2": {
+        2: [
+            (("미끼", "먹이", "낚싯바늘", "바늘"), ("안물", "물지않", "먹지않", "안먹", "관심", "안무")),
+            (("물고기", "고기", "낚시"), ("안잡", "못잡", "잡히지", "잘안", "안될", "되지않", "물지않", "안물")),
+            (("입질",),),
+        ],
+        1: [
+            (("낚시", "물고기", "고기", "송어"),),
+        ],
+        "botched": [],
+    },
+    "C3": {
+        2: [
+            (("미끼",),),
+            (("물고기", "고기", "송어"), ("잡", "낚")),
+        ],
+        1: [
+            (("낚시",),),
+        ],
+        "botched": [
+            (("먹으려", "먹기위해", "요리", "저녁", "식사", "애완"),),
+        ],
+    },
+    "C4": {
+        2: [
+            (("경험", "익숙", "능숙", "잘하", "잘한", "할줄", "알고있"),
+             ("미끼", "줄을", "낚싯줄", "입에", "입으로", "보트", "노를", "던지", "좋아", "물어", "교정", "고쳐")),
+        ],
+        1: [
+            (("경험", "익숙", "능숙", "서툴", "초보"),),
+        ],
+        "botched": [
+            (("익숙하지않", "경험이없", "경험없", "낚시를못", "전혀모르"),),
+        ],
+    },
+    "M1": {
+        2: [
+            (("빈정", "비꼬", "비꼰", "냉소", "비아냥", "일부러", "의도적", "시비", "싸움", "자극"),
+             ("화나", "화가", "슬프", "짜증", "귀찮", "헤어지", "상처", "떠나", "먼저")),
+        ],
+        1: [
+            (("빈정", "비꼬", "비꼰", "냉소", "비아냥", "불행", "짜증", "긴장", "지루", "싫증", "질렸") + _BREAKUP,),
+        ],
+        "botched": [
+            (("아는척", "잘난척", "다아는", "못된사람", "나쁜사람"),),
+        ],
+    },
+    "M2": {
+        2: [
+            (("싸움", "시비", "괴롭", "일부러", "의도"), ("알", "눈치", "느끼", "느꼈", "싫")),
+            (_BREAKUP + ("끝",), ("감지", "눈치", "예감", "알아차", "알았", "느끼", "느꼈", "직감")),
+        ],
+        1: [
+            (("싸우고싶지", "다투고싶지", "싸우기싫", "다투기싫", "싸움", "다툼", "전에도", "이전에도",
+              "예전에도", "또", "망치", "좋은 날", "분위기"),),
+        ],
+        "botched": [],
+    },
+    "M3": {
+        2: [
+            (("마저리", "마조리", "그녀"),
+             ("반응", "표정", "얼굴", "상처", "화가", "화난", "판단", "슬퍼", "슬픈", "실망", "눈물")),
+        ],
+        1: [
+            (("죄책", "미안", "수치", "부끄", "슬프", "불편", "어색", "잘못된 결정", "확신") + _BREAKUP,),
+        ],
+        "botched": [
+            (("자신 표정", "자기 표정", "자신 반응", "자기 반응", "자신 감정 들키", "속마음 들키"),),
+        ],
+    },
+    "M4": {
+        2: [
+            (("관계", "사랑", "연애", "함께", "같이", "그녀와", "마저리와", "마조리와"),
+             ("지치", "지쳤", "끝내", "재미없", "재미가없", "즐겁지", "행복하지", "싫", "질렸", "식었")),
+        ],
+        1: [
+            (("그녀", "마저리", "마조리"), ("시간", "주변", "옆에", "있는것")),
+        ],
+        "botched": [
+            (("낚시만", "낚시가재미", "낚시하는게재미", "낚시하는것이재미", "물고기가안"),),
+        ],
+    },
+    "M5": {
+        2: [
+            (_BREAKUP + ("끝",), ("알", "눈치", "예감", "직감", "깨달")),
+            (("대답", "답이", "답을", "말을", "말이"), ("두려", "무서", "듣고싶지", "듣기싫", "상처")),
+            (("취약", "상처", "화난", "우는", "눈물", "약한"), ("보여주", "보이", "들키")),
+        ],
+        1: [
+            (("화가", "화나", "짜증", "울", "두려", "무서", "불편", "어색", "슬퍼", "슬픈"),),
+        ],
+        "botched": [],
+    },
+    "M6": {
+        2: [
+            (_BREAKUP + ("끝", "깨달", "거절", "혼자", "공간"), _NEG_EMOTION + ("거부", "배신")),
+        ],
+        1: [
+            (_NEG_EMOTION + ("거부", "배신"),),
+            (_BREAKUP + ("깨달",),),
+        ],
+        "botched": [],
+    },
+    "M7": {
+        2: [
+            (("친구", "연인", "애인"), ("미리", "이미", "알고", "계획", "예상", "예견", "짜고")),
+        ],
+        1: [
+            (("친구", "연인", "애인", "아는사람", "지인", "동료", "사이"),),
+        ],
+        "botched": [],
+    },
+    "M8": {
+        2: [
+            (_NEG_EMOTION + ("죄책", "미안", "후회"), ("마저리", "마조리", "그녀") + _BREAKUP),
+        ],
+        1: [
+            (_NEG_EMOTION + ("죄책", "미안", "후회", "혼란", "복잡"),),
+        ],
+        "botched": [],
+    },
+    "C5": {
+        2: [
+            (("관계", "사랑", "연애", "순수", "행복", "둘사이", "사이"), ("끝", "종말", "마지막", "이별")),
+            (_BREAKUP,),
+        ],
+        1: [
+            (("제재소", "호튼", "마을", "벌목"), ("끝", "종말", "쇠퇴", "사라", "몰락")),
+        ],
+        "botched": [],
+    },
+}
+
+# 모든 문항 공통: 응답을 포기한 경우 (점수 패턴이 없으면 검토 없이 0점)
+DONT_KNOW = ("모르겠", "모름", "기억안", "기억이안", "잘모르")
+
+_SECTION_RE = re.compile(r'^(\d+)\)\s*(.+?):\s*(.+)$')
+_LEVEL_RE = re.compile(r'^(\d)점\s*[–-]\s*(.+)$')
+
+
+def load_rubric(path=RUBRIC_PATH):
+    """루브릭 텍스트를 문항별 구조로 변환
+
+    반환: {QID: {'number', 'category', 'question', 'max_score', 'levels': {점수: [기준, ...]}}}
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    body = text.split("채점 지침 및 루브릭", 1)[-1].split("채점 요약", 1)[0]
+
+    rubric = {}
+    current = None
+    for line in body.splitlines():
+        line = line.strip()
+        section = _SECTION_RE.match(line)
+        if section and section.group(2) in CATEGORIES:
+            number = int(section.group(1))
+            current = {
+                'number': number,
+                'category': CATEGORIES[section.group(2)],
+                'question': section.group(3),
+                'levels': {},
+            }
+            rubric[RUBRIC_ITEMS[number - 1]] = current
+            continue
+        level = _LEVEL_RE.match(line)
+        if level and current is not None:
+            criteria = [c.strip() for c in level.group(2).split(';') if c.strip()]
+            current['levels'][int(level.group(1))] = criteria
+
+    for item in rubric.values():
+        # 점수 기준 줄이 없는 문항(자발적 정신 상태 추론)은 0/1점으로 코딩
+        item['max_score'] = max(item['levels']) if item['levels'] else 1
+
+    missing = [qid for qid in RUBRIC_ITEMS if qid not in rubric]
+    if missing:
+        raise ValueError(f"루브릭에서 찾지 못한 문항: {missing}")
+    return rubric
+
+
+def _compile_item(rules):
+    """문항 규칙을 하나의 키워드 매처로 컴파일
+
+    단어 묶음마다 라벨 (점수, 패턴 번호, 묶음 번호)를 붙이고,
+    응답 포기 표현은 라벨 "dont_know"로 함께 넣습니다.
+    """
+    keywords = {}
+    patterns = {}
+    for level, level_patterns in rules.items():
+        patterns[level] = []
+        for p, pattern in enumerate(level_patterns):
+            labels = []
+            for g, group in enumerate(pattern):
+                keywords[(level, p, g)] = group
+                labels.append((level, p, g))
+            patterns[level].append(labels)
+    keywords["dont_know"] = DONT_KNOW
+    matcher = KeywordMatcher(keywords)
+    columns = {label: i for i, label in enumerate(matcher.labels)}
+    # 패턴별 라벨 열 번호: 모든 열이 True인 행이 패턴과 일치
+    compiled = {
+        level: [[columns[label] for label in labels] for labels in level_patterns]
+        for level, level_patterns in patterns.items()
+    }
+    return matcher, compiled, columns["dont_know"]
+
+
+def _any_pattern(matrix, patterns):
+    mask = np.zeros(matrix.shape[0], dtype=bool)
+    for cols in patterns:
+        mask |= matrix[:, cols].all(axis=1)
+    return mask
+
+
+class RubricScorer:
+    """루브릭 + 키워드 규칙으로 응답을 일괄 채점"""
+
+    def __init__(self, rubric=None, keywords=None, text_cache=None):
+        self.text_cache = text_cache
+        self.rubric = rubric if rubric is not None else load_rubric()
+        self.keywords = keywords if keywords is not None else KEYWORDS
+        for qid, item in self.rubric.items():
+            if qid in DETECTORS:
+                continue
+            rules = self.keywords.get(qid)
+            if rules is None:
+                raise ValueError(f"{qid} 문항의 키워드 규칙이 없습니다.")
+            levels = [level for level in rules if level != "botched"]
+            if max(levels) > item['max_score']:
+                raise ValueError(f"{qid} 문항의 키워드 점수가 루브릭 최고점({item['max_score']})보다 큽니다.")
+        # 문항별 오토마톤은 한 번만 컴파일해 재사용
+        self._compiled = {qid: _compile_item(self.keywords[qid]) for qid in self.rubric if qid not in DETECTORS}
+
+    def score_item(self, qid, responses):
+        """한 문항의 응답들을 채점 → (점수 배열, 검토 사유 배열)"""
+        if qid in DETECTORS:
+            detected, review = DETECTORS[qid](responses)
+            scores = np.where(detected, self.rubric[qid]['max_score'], 0)
+            return scores, np.where(review, REASON_DETECTOR, '').astype(object)
+
+        matcher, patterns, dont_know_col = self._compiled[qid]
+        texts, matrix = match_column(matcher, responses, self.text_cache)
+
+        # 높은 점수부터 검사하므로 1점과 2점에 모두 해당하면 2점
+        scores = np.zeros(len(texts), dtype=int)
+        matched = np.zeros(len(texts), dtype=bool)
+        for level in sorted((l for l in patterns if l != "botched"), reverse=True):
+            hit = _any_pattern(matrix, patterns[level]) & ~matched
+            scores[hit] = level
+            matched |= hit
+
+        reasons = np.full(len(texts), '', dtype=object)
+
+        # 망친 응답은 0점, 점수 패턴도 함께 있으면 철회했을 수 있으므로 검토
+        botched = _any_pattern(matrix, patterns.get("botched", []))
+        reasons[botched & matched] = REASON_BOTCHED_CONFLICT
+        scores[botched] = 0
+
+        # 점수 패턴이 없는 응답은 0점으로 두되, 빈 응답/모르겠다는 응답이 아니면 검토
+        empty = texts == ''
+        dont_know = matrix[:, dont_know_col]
+        reasons[~matched & ~botched & ~empty & ~dont_know] = REASON_NO_MATCH
+        return scores, reasons
+
+    def score_frame(self, frame, items=None):
+        """response_<QID> 열이 있는 DataFrame을 채점
+
+        문항별 score_<QID>, review_<QID>(검토 사유) 열과
+        영역별 점수, 총점, 검토 필요 문항 수를 담은 DataFrame을 반환합니다.
+        items를 주면 그 문항만 채점하고 합계 열은 만들지 않습니다.
+        """
+        result = pd.DataFrame(index=frame.index)
+        for qid in (RUBRIC_ITEMS if items is None else items):
+            column = f"response_{qid}"
+            responses = frame[column] if column in frame else pd.Series([''] * len(frame), dtype=object)
+            scores, reasons = self.score_item(qid, responses)
+            result[f"score_{qid}"] = scores
+            result[f"review_{qid}"] = reasons
+        if items is None:
+            self.add_totals(result)
+        return result
+
+    def add_totals(self, result):
+        """문항별 score_/review_ 열로 영역별 점수, 총점, 검토 필요 문항 수 열 추가"""
+        totals = {category: np.zeros(len(result), dtype=int) for category in CATEGORIES.values()}
+        review_count = np.zeros(len(result), dtype=int)
+        for qid in RUBRIC_ITEMS:
+            totals[self.rubric[qid]['category']] += result[f"score_{qid}"].to_numpy(dtype=int)
+            review_count += (result[f"review_{qid}"].fillna('') != '').to_numpy()
+        for category, values in totals.items():
+            result[f"score_{category}"] = values
+        result["score_total"] = sum(totals.values())
+        result["review_count"] = review_count
+        return result
+
+    def item_fingerprints(self):
+        """문항별 채점 규칙 지문 {QID: 해시}
+
+        루브릭 기준, 키워드 규칙(또는 판별기 규칙), 정규화 버전 중 하나라도 바뀐 문항만 지문이 바뀌므로
+        저장된 점수 중 다시 채점해야 할 문항을 정확히 고를 수 있습니다.
+        """
+        fingerprints = {}
+        for qid, item in self.rubric.items():
+            if qid in DETECTORS:
+                rules = DETECTOR_FINGERPRINTS[qid]()
+            else:
+                rules = {str(level): patterns for level, patterns in self.keywords[qid].items()}
+                rules['dont_know'] = DONT_KNOW
+            payload = json.dumps(
+                {'rubric': item, 'rules': rules, 'normalizer': NORMALIZER_VERSION},
+                ensure_ascii=False, sort_keys=True, default=list
+            )
+            fingerprints[qid] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        return fingerprints
+
+    @property
+    def max_total(self):
+        return sum(item['max_score'] for item in self.rubric.values())
+
+
+def _read_table(path):
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SST 응답 자동 채점")
+    parser.add_argument("input", help="응답 CSV 또는 Parquet 파일 (response_<QID> 열 포함)")
+    parser.add_argument("--output", default="scored_results.csv", help="채점 결과 CSV")
+    parser.add_argument("--text-cache", default=None,
+                        help="정규화 결과 디스크 캐시 (예: data/text_cache.sqlite3, 다시 채점할 때 재사용)")
+    args = parser.parse_args()
+
+    frame = _read_table(args.input)
+    scorer = RubricScorer(text_cache=TextCache(path=args.text_cache) if args.text_cache else None)
+    scored = scorer.score_frame(frame)
+
+    id_columns = [c for c in ("timestamp", "participant_id") if c in frame]
+    pd.concat([frame[id_columns], scored], axis=1).to_csv(args.output, index=False, encoding='utf-8-sig')
+
+    needs_review = int((scored["review_count"] > 0).sum())
+    print(f"채점 완료: {len(frame)}명, 평균 총점 {scored['score_total'].mean():.1f}/{scorer.max_total}")
+    print(f"검토 필요: {needs_review}명 (문항 {int(scored['review_count'].sum())}개)")
+    print(f"저장: {args.output}")
@@ -0,0 +1,174 @@
+"""
+Google Sheets 공용 연결 계층
+프로세스당 하나의 인증된 클라이언트와 스프레드시트/워크시트 핸들을 재사용합니다.
+
+- 인증(Credentials 생성, gspread.authorize)은 프로세스에서 한 번만 수행
+- gspread 클라이언트의 HTTP 세션(AuthorizedSession)을 그대로 재사용
+- 액세스 토큰은 만료 전에 미리 갱신
+- client.open()의 Drive 이름 조회와 sheet1 메타데이터 조회도 한 번만 수행
+"""
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+
+try:
+    from google.oauth2.service_account import Credentials
+    from google.auth.transport.requests import Request
+    import gspread
+    GSPREAD_AVAILABLE = True
+except ImportError:
+    GSPREAD_AVAILABLE = False
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# 토큰 만료까지 이 시간보다 적게 남으면 미리 갱신
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+_lock = threading.RLock()
+_credentials = None
+_client = None
+_installed_client = None  # 테스트/벤치마크용 대체 클라이언트 (fake_gspread)
+_worksheets = {}  # (스프레드시트 이름, 워크시트 인덱스) -> Worksheet
+_verified_headers = {}  # (스프레드시트 ID, 워크시트 ID) -> (헤더 지문, 시트의 응답 열 목록)
+
+# 응답 열 뒤에 붙는 채점 결과 열 (score_pipeline.py가 기록, 헤더 검사에서 제외)
+DERIVED_PREFIXES = ("score_", "review_")
+
+
+class HeaderMismatchError(Exception):
+    """시트의 1행 헤더가 기대하는 스키마와 다를 때 발생"""
+
+
+def _refresh_token_if_needed():
+    """토큰이 없거나 곧 만료되면 미리 한 번 갱신
+
+    클라이언트의 인증 세션을 거치지 않고 단순 Request로 토큰만 받으므로 만료마다 한 번만 요청합니다.
+    """
+    if _credentials is None:
+        return
+    expiry = _credentials.expiry
+    if expiry is not None and expiry.tzinfo is None:
+        # google-auth의 expiry는 naive UTC datetime
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    if _credentials.token is None or expiry is None or \
+            expiry - datetime.now(timezone.utc) < TOKEN_REFRESH_MARGIN:
+        _credentials.refresh(Request())
+
+
+def install_client(client):
+    """인증 없이 사용할 클라이언트 설치 (None이면 해제)"""
+    global _installed_client
+    with _lock:
+        _installed_client = client
+        _worksheets.clear()
+        _verified_headers.clear()
+
+
+def get_client(credentials_info):
+    """프로세스 공용 gspread 클라이언트 반환 (최초 호출 시에만 인증)"""
+    if _installed_client is not None:
+        return _installed_client
+    if not GSPREAD_AVAILABLE:
+        raise RuntimeError("gspread가 설치되어 있지 않습니다.")
+
+    global _credentials, _client
+    with _lock:
+        if _client is None:
+            _credentials = Credentials.from_service_account_info(
+                dict(credentials_info),
+                scopes=SCOPES
+            )
+            _client = gspread.authorize(_credentials)
+        _refresh_token_if_needed()
+        return _client
+
+
+def get_worksheet(credentials_info, spreadsheet_name, index=0):
+    """캐시된 워크시트 핸들 반환 (Drive 이름 조회는 최초 한 번만)"""
+    key = (spreadsheet_name, index)
+    with _lock:
+        client = get_client(credentials_info)
+        worksheet = _worksheets.get(key)
+        if worksheet is None:
+            spreadsheet = client.open(spreadsheet_name)
+            worksheet = spreadsheet.get_worksheet(index)
+            _worksheets[key] = worksheet
+        return worksheet
+
+
+def header_fingerprint(headers):
+    """헤더 목록의 스키마 지문"""
+    return hashlib.sha1('\x1f'.join(headers).encode('utf-8')).hexdigest()
+
+
+def data_headers(headers):
+    """1행 헤더에서 뒤쪽 채점 결과 열을 뺀 응답 열 목록"""
+    headers = list(headers)
+    while headers and headers[-1].startswith(DERIVED_PREFIXES):
+        headers.pop()
+    return headers
+
+
+def headers_compatible(existing, headers, optional=()):
+    """existing이 headers와 같거나, headers에서 뒤쪽 optional 열만 빠진 것인지"""
+    existing, headers = list(existing), list(headers)
+    return existing == headers[:len(existing)] and all(h in optional for h in headers[len(existing):])
+
+
+def ensure_header(worksheet, headers, writer=None, optional=()):
+    """1행만 읽어 헤더를 확인하고, 비어 있으면 헤더를 추가한 뒤 시트의 응답 열 목록 반환
+
+    한 번 확인된 헤더는 지문으로 캐시되어 이후 저장에서는 API 호출이 없습니다.
+    데이터 행은 읽지 않으므로 비용이 응답 수와 무관합니다.
+    응답 열 뒤에 채점 결과 열(DERIVED_PREFIXES)이 붙어 있는 것은 허용합니다.
+    optional: 시트에 없어도 되는 headers 뒤쪽 열 (예: 스키마 v2의 반응 시간 열)
+    writer(SheetsWriter)를 지정하면 호출이 쿼터/재시도 규칙을 따릅니다.
+    """
+    key = (worksheet.spreadsheet.id, worksheet.id)
+    fingerprint = f"{header_fingerprint(headers)}:{header_fingerprint(optional)}"
+    with _lock:
+        cached = _verified_headers.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return list(cached[1])
+
+    if writer is None:
+        existing = worksheet.row_values(1)
+    else:
+        existing = writer.row_values(worksheet, 1)
+    accepted = list(headers)
+    if not existing:
+        if writer is None:
+            worksheet.append_row(headers)
+        else:
+            writer.append_row(worksheet, headers)
+    elif not headers_compatible(data_headers(existing), headers, optional):
+        missing = [h for h in headers if h not in existing]
+        extra = [h for h in data_headers(existing) if h not in headers]
+        raise HeaderMismatchError(
+            f"시트 헤더가 현재 질문 구성과 다릅니다 (누락: {missing}, 추가: {extra}). "
+            f"migrate_sheets.py로 시트 열을 옮길 수 있습니다."
+        )
+    else:
+        accepted = data_headers(existing)
+
+    with _lock:
+        _verified_headers[key] = (fingerprint, accepted)
+    return list(accepted)
+
+
+def invalidate(spreadsheet_name=None):
+    """캐시된 핸들 폐기 (시트 삭제/재생성 후 또는 연결 오류 시 호출)"""
+    global _credentials, _client
+    with _lock:
+        if spreadsheet_name is None:
+            _credentials = None
+            _client = None
+            _worksheets.clear()
+            _verified_headers.clear()
+        else:
+            for key in [k for k in _worksheets if k[0] == spreadsheet_name]:
+                worksheet = _worksheets.pop(key)
+                _verified_headers.pop((worksheet.spreadsheet.id, worksheet.id), None)
@@ -0,0 +1,182 @@
+"""
+쿼터 인식 Google Sheets 호출기
+클라이언트 측 토큰 버킷으로 Sheets API의 분당 요청 한도를 지키고,
+429/5xx 응답은 지터가 섞인 지수 백오프로 재시도합니다.
+행 추가(append)는 멱등이 아니므로 서버가 처리하지 않은 것이 확실한 429/503만 재시도합니다.
+
+Sheets API 기본 한도: 사용자당 분당 읽기 60회, 쓰기 60회
+"""
+import random
+import threading
+import time
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# 멱등이 아닌 호출(행 추가)의 재시도 대상: 요청이 처리되지 않은 것이 확실한 경우만
+# (500/502/504는 이미 기록된 뒤 응답만 실패했을 수 있어 재시도하면 행이 중복됨)
+APPEND_RETRYABLE_STATUS = {429, 503}
+
+# 요청이 처리되었는지 알 수 없는 상태 코드 (행 추가 실패 시 시트를 확인해야 함)
+AMBIGUOUS_STATUS = RETRYABLE_STATUS - APPEND_RETRYABLE_STATUS
+
+
+class RetryBudgetExceeded(Exception):
+    """재시도 예산이 소진되어 더 이상 재시도하지 않을 때 발생"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """토큰이 있으면 꺼내고 True, 없으면 기다리지 않고 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """토큰이 생길 때까지 기다린 뒤 꺼냄 (기다린 시간(초) 반환)"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def status_code(exc):
+    """gspread APIError 등에서 HTTP 상태 코드 추출"""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(exc, 'code', None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc):
+    """Retry-After 헤더 값(초), 없으면 None"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class SheetsWriter:
+    """Sheets API 호출을 쿼터 안에서 실행하고 일시적 오류를 재시도
+
+    reads_per_minute / writes_per_minute: 클라이언트 측 요청 한도
+    burst: 한 번에 연달아 보낼 수 있는 최대 요청 수
+    max_retries: 한 호출당 최대 재시도 횟수
+    base_delay / max_delay: 지수 백오프의 시작/최대 대기 시간(초)
+    retries_per_minute: 프로세스 전체 재시도 예산 (장애 시 재시도 폭주 방지)
+    """
+
+    def __init__(self, reads_per_minute=60, writes_per_minute=60, burst=10,
+                 max_retries=5, base_delay=1.0, max_delay=64.0, retries_per_minute=30):
+        self._buckets = {
+            'read': TokenBucket(reads_per_minute / 60.0, burst),
+            'write': TokenBucket(writes_per_minute / 60.0, burst),
+        }
+        self._retry_budget = TokenBucket(retries_per_minute / 60.0, retries_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'throttled': 0,           # 토큰 버킷 때문에 대기한 호출 수
+            'throttle_wait_sec': 0.0,
+            'retried': 0,             # 재시도 횟수 (429/5xx)
+            'rate_limited': 0,        # 서버가 429를 반환한 횟수
+            'failed': 0,              # 재시도 후에도 실패한 호출 수
+        }
+
+    def _count(self, key, value=1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def _backoff(self, attempt, exc):
+        """attempt번째 재시도 전 대기 시간 (full jitter, Retry-After 우선)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, func, *args, kind='write', retry_on=RETRYABLE_STATUS, **kwargs):
+        """func(*args, **kwargs)를 한도 안에서 실행 (retry_on: 재시도할 HTTP 상태 코드)"""
+        bucket = self._buckets[kind]
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            self._count('calls')
+            if waited > 0:
+                self._count('throttled')
+                self._count('throttle_wait_sec', waited)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = status_code(e)
+                if status not in retry_on:
+                    self._count('failed')
+                    raise
+                if status == 429:
+                    self._count('rate_limited')
+                if attempt >= self.max_retries:
+                    self._count('failed')
+                    raise
+                if not self._retry_budget.try_acquire():
+                    self._count('failed')
+                    raise RetryBudgetExceeded(f"재시도 예산 소진: {e}") from e
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+                self._count('retried')
+
+    # 자주 쓰는 gspread 호출
+    def append_rows(self, worksheet, rows, **kwargs):
+        return self.call(worksheet.append_rows, rows, retry_on=APPEND_RETRYABLE_STATUS, **kwargs)
+
+    def append_row(self, worksheet, row, **kwargs):
+        return self.call(worksheet.append_row, row, retry_on=APPEND_RETRYABLE_STATUS, **kwargs)
+
+    def clear(self, worksheet):
+        return self.call(worksheet.clear)
+
+    def row_values(self, worksheet, row):
+        return self.call(worksheet.row_values, row, kind='read')
+
+    def get_all_values(self, worksheet):
+        return self.call(worksheet.get_all_values, kind='read')
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def get_default_writer():
+    """프로세스 공용 SheetsWriter (모든 호출이 같은 쿼터를 공유)"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = SheetsWriter()
+        return _default_writer
@@ -0,0 +1,146 @@
+"""
+참가자 응답 로컬 스풀 (SQLite, WAL 모드)
+완료된 세션은 먼저 로컬 파일에 기록되고, 백그라운드 동기화가
+Google Sheets에 올린 뒤 synced_at을 표시합니다.
+Sheets가 느리거나 중단되어도 응답은 이 파일에 남습니다.
+다시 시도해도 올릴 수 없는 행은 failed_at/last_error를 표시(격리)하고 대기 목록에서 뺍니다.
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+class SubmissionSpool:
+    """추가 전용(append-only) 응답 저장소
+
+    path: SQLite 파일 경로 (":memory:"도 가능)
+    """
+
+    def __init__(self, path):
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # WAL: 쓰기는 로그 끝에 추가만 하므로 빠르고, 읽기와 서로 막지 않음
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 커밋마다 WAL을 fsync하여 프로세스/서버가 죽어도 응답 유지
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                row_json TEXT NOT NULL,
+                synced_at TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_submissions_pending
+            ON submissions (id) WHERE synced_at IS NULL
+        """)
+        # 세션별 제출 ID (중복 저장 방지용) - 이전 버전 스풀 파일에는 컬럼 추가
+        columns = [info[1] for info in self._conn.execute("PRAGMA table_info(submissions)")]
+        if 'submission_id' not in columns:
+            self._conn.execute("ALTER TABLE submissions ADD COLUMN submission_id TEXT")
+        # 격리 표시 (업로드할 수 없는 행) - 이전 버전 스풀 파일에는 컬럼 추가
+        if 'failed_at' not in columns:
+            self._conn.execute("ALTER TABLE submissions ADD COLUMN failed_at TEXT")
+        if 'last_error' not in columns:
+            self._conn.execute("ALTER TABLE submissions ADD COLUMN last_error TEXT")
+        self._conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_submission_id
+            ON submissions (submission_id)
+        """)
+
+    def add(self, row, submission_id=None):
+        """행을 기록하고 스풀 ID 반환
+
+        같은 submission_id가 이미 기록되어 있으면 아무것도 쓰지 않고 None 반환
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO submissions (created_at, row_json, submission_id) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), json.dumps(row, ensure_ascii=False), submission_id)
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def contains(self, submission_id):
+        """해당 제출 ID가 이미 기록되었는지 확인"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM submissions WHERE submission_id = ?", (submission_id,)
+            ).fetchone() is not None
+
+    def pending(self, limit=100, exclude=()):
+        """아직 동기화되지 않은 (ID, 행) 목록 (오래된 순, 격리된 행 제외)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, row_json FROM submissions WHERE synced_at IS NULL AND failed_at IS NULL "
+                "ORDER BY id LIMIT ?",
+                (limit + len(exclude),)
+            )
+            rows = [(row_id, json.loads(row_json)) for row_id, row_json in cursor]
+        return [(row_id, row) for row_id, row in rows if row_id not in exclude][:limit]
+
+    def pending_count(self):
+        """동기화 대기 중인 행 수 (격리된 행 제외)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM submissions WHERE synced_at IS NULL AND failed_at IS NULL"
+            ).fetchone()[0]
+
+    def failed_count(self):
+        """격리된(업로드할 수 없어 실패 표시된) 행 수"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM submissions WHERE synced_at IS NULL AND failed_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def mark_synced(self, ids):
+        """동기화 완료 표시"""
+        if not ids:
+            return
+        synced_at = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE submissions SET synced_at = ? WHERE id = ?",
+                    [(synced_at, row_id) for row_id in ids]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # 열린 트랜잭션을 남기면 이후 BEGIN이 모두 실패하므로 되돌림
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def mark_failed(self, failures):
+        """격리 표시: failures는 (ID, 오류 메시지) 목록 (행은 지우지 않고 대기 목록에서만 빠짐)"""
+        if not failures:
+            return
+        failed_at = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE submissions SET failed_at = ?, last_error = ? WHERE id = ?",
+                    [(failed_at, error, row_id) for row_id, error in failures]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def retry_failed(self):
+        """격리 표시를 지워 다시 대기 목록에 넣고, 그 행 수 반환 (last_error는 남김)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE submissions SET failed_at = NULL WHERE synced_at IS NULL AND failed_at IS NOT NULL"
+            )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
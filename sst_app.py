@@ -11,15 +11,17 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import json
+import math
+import os
+import uuid
 from pathlib import Path
 
-# Google Sheets 연동을 위한 import
-try:
-    from google.oauth2.service_account import Credentials
-    import gspread
-    GSPREAD_AVAILABLE = True
-except ImportError:
-    GSPREAD_AVAILABLE = False
+import sst_assets
+import sst_schema
+from spool import SubmissionSpool
+from sst_schema import ENCODER, GOOGLE_SHEETS_NAME, HEADERS, OPTIONAL_COLUMNS
+from storage import load_config as load_storage_config, open_backend
+from write_queue import WriteBehindQueue
 
 # ============================================
 # 설정 영역 - 여기에 텍스트와 질문을 입력하세요
@@ -105,185 +107,135 @@ def story_text_to_html(story: str) -> str:
 QUALTRICS_GUIDE_IMAGE = Path(__file__).resolve().parent / "image (1).png"
 
 # 질문 목록 설정
-# 각 질문은 딕셔너리 형태: {"id": 고유ID, "type": 질문유형, "text": 질문내용}
+# 질문 문구: {문항 id: 질문내용}
+# 문항 id/유형/순서는 시트 열 구성이므로 sst_schema.QUESTIONS에서만 정합니다.
 # type: "spontaneous" (자발적 추론), "mental_state" (정신상태 추론), "comprehension" (이해력)
 
-QUESTIONS = [
+QUESTION_TEXTS = {
     # 1. 자발적 정신상태 추론 (1문항)
-    {
-        "id": "S1",
-        "type": "spontaneous",
-        "text": "지금까지 읽은 단편 소설을 간단히 요약해 주세요."
-    },
+    "S1": "지금까지 읽은 단편 소설을 간단히 요약해 주세요.",
 
     # 2. 이해력 질문 (4문항)
-    {
-        "id": "C1",
-        "type": "comprehension",
-        "text": "닉과 마저리가 곶으로 가는 길에 낚싯줄을 늘어뜨린 채 노를 젓는 동안, 해안선에서 무엇을 목격하나요?"
-    },
-    {
-        "id": "C2",
-        "type": "comprehension",
-        "text": "닉이 \"물려고 덤비지는 않을 거야.\"라고 한 것은 어떤 의미인가요?"
-    },
-    {
-        "id": "C3",
-        "type": "comprehension",
-        "text": "닉과 마저리는 왜 살아 있는 농어가 담긴 양동이를 가지고 있었나요?"
-    },
-    {
-        "id": "C4",
-        "type": "comprehension",
-        "text": "마저리의 행동이 그녀가 낚시에 익숙한지 그렇지 않은지 보여주나요? 왜 그렇게 생각하시나요?"
-    },
+    "C1": "닉과 마저리가 곶으로 가는 길에 낚싯줄을 늘어뜨린 채 노를 젓는 동안, 해안선에서 무엇을 목격하나요?",
+    "C2": "닉이 \"물려고 덤비지는 않을 거야.\"라고 한 것은 어떤 의미인가요?",
+    "C3": "닉과 마저리는 왜 살아 있는 농어가 담긴 양동이를 가지고 있었나요?",
+    "C4": "마저리의 행동이 그녀가 낚시에 익숙한지 그렇지 않은지 보여주나요? 왜 그렇게 생각하시나요?",
 
     # 3. 명시적 정신상태 추론 (8문항)
-    {
-        "id": "M1",
-        "type": "mental_state",
-        "text": "닉이 마저리에게 \"넌 모르는 게 없지.\"라고 말하는 이유는 무엇인가요?"
-    },
-    {
-        "id": "M2",
-        "type": "mental_state",
-        "text": "마저리가 \"오, 닉, 제발 그만해! 제발, 제발 그런 식으로 굴지 좀 마!\"라고 대답하는 이유는 무엇인가요?"
-    },
-    {
-        "id": "M3",
-        "type": "mental_state",
-        "text": "닉이 마저리를 똑바로 바라보기 두려워하는 이유는 무엇인가요?"
-    },
-    {
-        "id": "M4",
-        "type": "mental_state",
-        "text": "닉이 \"이런 일이 더 이상 재미가 없어.\"라고 한 것은 어떤 의미인가요?"
-    },
-    {
-        "id": "M5",
-        "type": "mental_state",
-        "text": "마저리가 \"사랑도 재미가 없는 거야?\"라고 물을 때, 마저리가 닉에게 등을 돌리고 앉아 있는 이유는 무엇인가요?"
-    },
-    {
-        "id": "M6",
-        "type": "mental_state",
-        "text": "마저리가 보트를 타고 떠나는 이유는 무엇이고, 그 순간 그녀는 어떤 감정을 느끼고 있나요?"
-    },
-    {
-        "id": "M7",
-        "type": "mental_state",
-        "text": "빌은 누구이고, 그가 닉에게 \"마저리는 잘 갔어?\"와 \"한바탕했어?\"라고 묻는 장면은 어떤 것을 드러내나요?"
-    },
-    {
-        "id": "M8",
-        "type": "mental_state",
-        "text": "닉이 \"제발 좀 가줘, 빌! 잠깐만 자리 비워줘.\"라고 말할 때, 닉은 어떤 감정을 느끼고 있나요?"
-    },
+    "M1": "닉이 마저리에게 \"넌 모르는 게 없지.\"라고 말하는 이유는 무엇인가요?",
+    "M2": "마저리가 \"오, 닉, 제발 그만해! 제발, 제발 그런 식으로 굴지 좀 마!\"라고 대답하는 이유는 무엇인가요?",
+    "M3": "닉이 마저리를 똑바로 바라보기 두려워하는 이유는 무엇인가요?",
+    "M4": "닉이 \"이런 일이 더 이상 재미가 없어.\"라고 한 것은 어떤 의미인가요?",
+    "M5": "마저리가 \"사랑도 재미가 없는 거야?\"라고 물을 때, 마저리가 닉에게 등을 돌리고 앉아 있는 이유는 무엇인가요?",
+    "M6": "마저리가 보트를 타고 떠나는 이유는 무엇이고, 그 순간 그녀는 어떤 감정을 느끼고 있나요?",
+    "M7": "빌은 누구이고, 그가 닉에게 \"마저리는 잘 갔어?\"와 \"한바탕했어?\"라고 묻는 장면은 어떤 것을 드러내나요?",
+    "M8": "닉이 \"제발 좀 가줘, 빌! 잠깐만 자리 비워줘.\"라고 말할 때, 닉은 어떤 감정을 느끼고 있나요?",
 
     # 4. 이해력 질문 (1문항)
-    {
-        "id": "C5",
-        "type": "comprehension",
-        "text": "이 이야기의 제목은 \"어떤 일의 끝\"입니다. 이 제목은 무엇을 가리키나요?"
-    },
-]
+    "C5": "이 이야기의 제목은 \"어떤 일의 끝\"입니다. 이 제목은 무엇을 가리키나요?",
+}
 
-# Google Sheets 설정
-GOOGLE_SHEETS_NAME = "SST_Responses"  # 스프레드시트 이름
+# 화면에 표시하는 질문 목록: {"id": 고유ID, "type": 질문유형, "text": 질문내용}
+QUESTIONS = sst_schema.build_questions(QUESTION_TEXTS)
 
-# ============================================
-# Google Sheets 연동 함수
-# ============================================
+# 저장소 설정: 기본은 Google Sheets
+# secrets의 [storage] 섹션 또는 환경 변수(SST_STORAGE_BACKEND, SST_STORAGE_PATH)로 변경
+#   backend: "sheets" | "sqlite" | "parquet" | "memory"
+#   path: sqlite 파일 또는 parquet 디렉터리 경로
 
-def get_google_sheets_client():
-    """Google Sheets 클라이언트 생성"""
-    if not GSPREAD_AVAILABLE:
-        return None
+# 응답 쓰기 큐 설정
+WRITE_FLUSH_INTERVAL_SEC = 2.0   # 배치를 모으는 간격 (append_rows 호출 최대 빈도)
+WRITE_MAX_BATCH = 100            # 한 번의 append_rows에 담을 최대 행 수
+WRITE_MAX_PENDING = 1000         # 큐에 쌓일 수 있는 최대 행 수
+WRITE_SUBMIT_TIMEOUT_SEC = 1.0   # 큐가 가득 찼을 때 대기 시간 (초과 시 즉시 저장)
 
-    try:
-        # Streamlit secrets에서 credentials 가져오기
-        credentials_dict = st.secrets["gcp_service_account"]
+# 로컬 응답 스풀 (모든 응답이 먼저 기록되는 SQLite 파일, 환경 변수 SST_SPOOL_PATH로 변경)
+SPOOL_PATH = Path(os.environ.get(
+    "SST_SPOOL_PATH", Path(__file__).resolve().parent / "data" / "submissions.sqlite3"
+))
 
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
+# 질문을 브라우저에서 진행 (기본값, 환경 변수 SST_CLIENT_RUNNER=0이면 서버 폼으로 진행)
+# 14개 질문 동안 서버 재실행 없이 마지막에 응답 전체와 문항별 반응 시간을 한 번만 전송합니다.
+# 서버 폼은 컴포넌트를 쓸 수 없는 환경을 위한 대체 경로이며, 반응 시간(rt) 열이 빈 칸으로 남습니다.
+CLIENT_QUESTION_RUNNER = os.environ.get("SST_CLIENT_RUNNER", "1") != "0"
 
-        credentials = Credentials.from_service_account_info(
-            credentials_dict,
-            scopes=scopes
-        )
+# ============================================
+# 저장소 연동 함수
+# ============================================
 
-        client = gspread.authorize(credentials)
-        return client
-    except Exception as e:
-        st.error(f"Google Sheets 연결 실패: {e}")
-        return None
+def _secrets():
+    """Streamlit secrets (secrets 파일이 없으면 빈 딕셔너리)"""
+    try:
+        return st.secrets.to_dict()
+    except FileNotFoundError:
+        return {}
+
+def check_storage_config():
+    """저장소 설정 확인 (Sheets는 서비스 계정 정보 필요)"""
+    secrets = _secrets()
+    if load_storage_config(secrets, GOOGLE_SHEETS_NAME)['backend'] != 'sheets':
+        return True
+    return "gcp_service_account" in secrets
+
+@st.cache_resource
+def get_storage_backend():
+    """프로세스 공용 저장소 백엔드"""
+    return open_backend(_secrets(), GOOGLE_SHEETS_NAME)
+
+def build_response_row(participant_info: dict, responses: dict, pre_story_responses: dict, timing: dict,
+                       rt: dict = None):
+    """응답 데이터를 시트 한 행으로 변환 (열 구성은 sst_schema.COLUMNS)"""
+    return ENCODER.encode(
+        participant=participant_info,
+        pre_story=pre_story_responses,
+        responses=responses,
+        timing=timing,
+        rt=rt
+    )
 
-def save_to_google_sheets(participant_info: dict, responses: dict, pre_story_responses: dict, timing: dict):
-    """응답 데이터를 Google Sheets에 저장"""
-    client = get_google_sheets_client()
+def write_rows_to_storage(rows: list, backend=None):
+    """여러 행을 한 번의 append_many 호출로 저장 (실패 시 저장소 예외를 그대로 전달)"""
+    if backend is None:
+        backend = get_storage_backend()
 
-    if client is None:
-        return False, "Google Sheets 연결 실패"
+    # 헤더 확인 및 추가 (Sheets는 1행만 조회, 확인 후에는 캐시)
+    # 반응 시간 열이 없는 v1 시트에는 그 열을 빼고 저장 (migrate_sheets.py 전에도 업로드가 막히지 않음)
+    backend.ensure_schema(HEADERS, optional=OPTIONAL_COLUMNS)
 
-    try:
-        # 스프레드시트 열기 (없으면 생성)
-        try:
-            spreadsheet = client.open(GOOGLE_SHEETS_NAME)
-        except gspread.SpreadsheetNotFound:
-            return False, f"스프레드시트 '{GOOGLE_SHEETS_NAME}'를 찾을 수 없습니다."
-
-        # 첫 번째 시트 선택
-        worksheet = spreadsheet.sheet1
-
-        # 헤더 확인 및 추가
-        existing_data = worksheet.get_all_values()
-
-        if len(existing_data) == 0:
-            # 헤더 생성
-            headers = [
-                'timestamp', 'participant_id',
-                'story_read_time_sec', 'questions_time_sec', 'total_time_sec',
-                'read_before', 'read_when', 'read_memory', 'read_context', 'read_context_other',
-                'read_grade', 'read_class', 'familiar', 'familiar_knowledge',
-                'familiar_discussion'
-            ]
-            for q in QUESTIONS:
-                headers.append(f"response_{q['id']}")
-
-            worksheet.append_row(headers)
-
-        # 데이터 행 구성
-        row = [
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            participant_info.get('id', ''),
-            str(round(timing.get('story_read_time', 0), 1)),
-            str(round(timing.get('questions_time', 0), 1)),
-            str(round(timing.get('total_time', 0), 1)),
-            pre_story_responses.get('read_before', ''),
-            pre_story_responses.get('read_when', ''),
-            pre_story_responses.get('read_memory', ''),
-            pre_story_responses.get('read_context', ''),
-            pre_story_responses.get('read_context_other', ''),
-            pre_story_responses.get('read_grade', ''),
-            pre_story_responses.get('read_class', ''),
-            pre_story_responses.get('familiar', ''),
-            pre_story_responses.get('familiar_knowledge', ''),
-            pre_story_responses.get('familiar_discussion', ''),
-        ]
-
-        for q in QUESTIONS:
-            row.append(responses.get(q['id'], ''))
-
-        # 행 추가
-        worksheet.append_row(row)
+    # 행 추가
+    backend.append_many(rows)
 
+def save_rows_to_storage(rows: list, backend=None):
+    """여러 행을 저장하고 (성공 여부, 메시지) 반환"""
+    try:
+        write_rows_to_storage(rows, backend=backend)
         return True, "저장 완료"
 
     except Exception as e:
         return False, f"저장 실패: {str(e)}"
 
+@st.cache_resource
+def get_submission_spool():
+    """프로세스 공용 로컬 응답 스풀"""
+    return SubmissionSpool(SPOOL_PATH)
+
+@st.cache_resource
+def get_write_queue():
+    """프로세스 공용 쓰기 지연 큐 (워커 스레드 포함, 스풀의 미동기화 행 업로드)"""
+    backend = get_storage_backend()
+
+    def sink(rows):
+        # 워커에서 호출: 원래 예외를 그대로 던져 큐가 재시도/격리를 판단하게 함
+        write_rows_to_storage(rows, backend=backend)
+
+    return WriteBehindQueue(
+        sink,
+        flush_interval=WRITE_FLUSH_INTERVAL_SEC,
+        max_batch=WRITE_MAX_BATCH,
+        max_pending=WRITE_MAX_PENDING,
+        spool=get_submission_spool()
+    ).start()
+
 # ============================================
 # 앱 기능 구현
 # ============================================
@@ -309,14 +261,45 @@ def init_session_state():
         st.session_state.questions_time = None
     if 'current_question_idx' not in st.session_state:
         st.session_state.current_question_idx = 0
-
-def check_google_sheets_config():
-    """Google Sheets 설정 확인"""
+    # 질문 진행 컴포넌트가 보낸 질문별 표시/제출 시각 (CLIENT_QUESTION_RUNNER)
+    if 'question_times' not in st.session_state:
+        st.session_state.question_times = {}
+    # 질문 진행 컴포넌트 시도 번호와 다시 시작하게 된 이유 (결과 검증 실패 시)
+    if 'runner_attempt' not in st.session_state:
+        st.session_state.runner_attempt = 0
+    if 'runner_error' not in st.session_state:
+        st.session_state.runner_error = None
+    # 문항별 반응 시간 (sst_schema의 rt 열, 밀리초) - 브라우저 진행 컴포넌트에서만 채워짐
+    if 'question_rt' not in st.session_state:
+        st.session_state.question_rt = {}
+    # 세션당 한 번만 저장하기 위한 제출 ID와 저장 완료 플래그
+    if 'submission_id' not in st.session_state:
+        st.session_state.submission_id = str(uuid.uuid4())
+    if 'submission_saved' not in st.session_state:
+        st.session_state.submission_saved = False
+
+@st.cache_resource
+def get_story_asset():
+    """소설 본문을 정적 자원(assets/story.<해시>.json)으로 한 번만 만들고 주소 반환 (실패하면 None)"""
     try:
-        _ = st.secrets["gcp_service_account"]
-        return True
-    except (KeyError, FileNotFoundError):
-        return False
+        return sst_assets.publish_story(story_text_to_html(STORY_TEXT))
+    except OSError:
+        return None
+
+def render_story_body(variant):
+    """소설 본문 표시 (variant: 'page' | 'pane')
+
+    본문은 브라우저가 캐시한 정적 자원에서 읽으므로 재실행 때는 주소만 전송됩니다.
+    정적 자원을 쓸 수 없으면 본문 HTML을 직접 보냅니다 (스타일은 assets/story.css).
+    """
+    src = get_story_asset()
+    if src is not None:
+        sst_assets.story_view(src, variant=variant, key=f"story_{variant}")
+    else:
+        st.markdown(
+            f'<div class="story-body {variant}">{story_text_to_html(STORY_TEXT)}</div>',
+            unsafe_allow_html=True
+        )
 
 def render_participant_info_page():
     """참가자 정보 입력 페이지"""
@@ -372,23 +355,7 @@ def render_story_page():
     st.markdown("---")
 
     # 소설 본문을 스크롤 가능한 컨테이너에 표시
-    st.markdown(
-        f"""
-        <div class="story-body" style="
-            background-color: #f9f9f9;
-            padding: 30px;
-            border-radius: 10px;
-            font-size: 1.1em;
-            line-height: 1.8;
-            max-height: 500px;
-            overflow-y: auto;
-            border: 1px solid #ddd;
-        ">
-        {story_text_to_html(STORY_TEXT)}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    render_story_body("page")
 
     st.markdown("---")
 
@@ -593,173 +560,176 @@ def render_pre_questions_page():
             st.session_state.page = 'questions'
             st.rerun()
 
+def render_question_intro():
+    """과제 안내문 (질문 열 위쪽)"""
+    st.markdown("""
+    아래 질문들에 대해 자유롭게 응답해 주세요. 질문은 총 14개이며, 각 질문에 답한 후 앞으로 다시 돌아갈 수 없습니다.
+    
+    질문을 처음에 보고 드는 생각을 작성해 주세요. 질문에 해당하는 경우, 등장인물의 생각, 감정, 의도에 대해서도 말씀해 주세요.
+    
+    대부분의 질문에는 정답이 없으며, 짧은 응답으로 답할 수 있습니다. 답변의 길이는 결과에 영향을 미치지 않습니다.
+    """)
+    st.markdown("---")
+
 def render_questions_page():
     """과제 페이지 - 왼쪽에 본문, 오른쪽에 질문 (한 번에 하나씩)"""
     st.title("과제")
 
-    # cmd+Enter 메시지 완전히 숨기기 (CSS + JavaScript)
-    st.markdown("""
-        <style>
-        /* 모든 form 내부의 small 태그 숨기기 */
-        .stForm small,
-        form small,
-        .stForm > div > div > div > small,
-        .stForm > div > div > small,
-        .stForm > div > small,
-        [data-testid="stForm"] small,
-        [data-testid="stForm"] > div > small,
-        [data-testid="stForm"] > div > div > small {
-            display: none !important;
-            visibility: hidden !important;
-            opacity: 0 !important;
-            height: 0 !important;
-            width: 0 !important;
-            overflow: hidden !important;
-            position: absolute !important;
-            left: -9999px !important;
-        }
-        /* tooltip도 숨기기 */
-        [data-testid="stTooltip"],
-        .stTooltip {
-            display: none !important;
-        }
-        </style>
-        <script>
-        // cmd+Enter 메시지 동적 제거
-        function removeCmdEnterMessage() {
-            // 모든 small 태그 찾기
-            const smallElements = document.querySelectorAll('small');
-            smallElements.forEach(el => {
-                const text = el.textContent || el.innerText || '';
-                if (text.includes('cmd+Enter') || text.includes('Press') || text.includes('submit form')) {
-                    el.style.display = 'none';
-                    el.style.visibility = 'hidden';
-                    el.style.opacity = '0';
-                    el.style.height = '0';
-                    el.style.width = '0';
-                    el.remove(); // 완전히 제거
-                }
-            });
-            
-            // form 내부의 모든 small 태그 제거
-            const forms = document.querySelectorAll('form, .stForm');
-            forms.forEach(form => {
-                const smalls = form.querySelectorAll('small');
-                smalls.forEach(small => {
-                    small.remove();
-                });
-            });
-        }
-        
-        // 페이지 로드 시 실행
-        if (document.readyState === 'loading') {
-            document.addEventListener('DOMContentLoaded', removeCmdEnterMessage);
-        } else {
-            removeCmdEnterMessage();
-        }
-        
-        // MutationObserver로 동적으로 추가되는 요소도 제거
-        const observer = new MutationObserver(function(mutations) {
-            removeCmdEnterMessage();
-        });
-        
-        observer.observe(document.body, {
-            childList: true,
-            subtree: true
-        });
-        
-        // 주기적으로 체크 (Streamlit이 동적으로 업데이트할 수 있음)
-        setInterval(removeCmdEnterMessage, 100);
-        </script>
-    """, unsafe_allow_html=True)
-
-    # 현재 질문 인덱스 확인
-    current_idx = st.session_state.current_question_idx
-    
-    # 첫 질문일 때 안내문 표시
-    if current_idx == 0:
-        st.markdown("""
-        아래 질문들에 대해 자유롭게 응답해 주세요. 질문은 총 14개이며, 각 질문에 답한 후 앞으로 다시 돌아갈 수 없습니다.
-        
-        질문을 처음에 보고 드는 생각을 작성해 주세요. 질문에 해당하는 경우, 등장인물의 생각, 감정, 의도에 대해서도 말씀해 주세요.
-        
-        대부분의 질문에는 정답이 없으며, 짧은 응답으로 답할 수 있습니다. 답변의 길이는 결과에 영향을 미치지 않습니다.
-        """)
-        st.markdown("---")
+    # cmd+Enter 안내 문구는 assets/forms.css로 숨김 (main()에서 세션당 한 번 연결)
 
     # 2컬럼 레이아웃: 왼쪽에 본문, 오른쪽에 질문
     left_col, right_col = st.columns([1, 1])
 
     with left_col:
         st.markdown(f"### 📖 {STORY_TITLE}")
-        st.markdown(
-            f"""
-            <div class="story-body" style="
-                background-color: #fafafa;
-                padding: 28px 32px;
-                border-radius: 12px;
-                font-size: 1.05em;
-                line-height: 2.0;
-                height: calc(100vh - 280px);
-                min-height: 500px;
-                max-height: 800px;
-                overflow-y: auto;
-                border: 1px solid #e0e0e0;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-            ">
-            {story_text_to_html(STORY_TEXT)}
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        render_story_body("pane")
 
     with right_col:
-        st.markdown("### ✏️ 질문")
-        
-        # 현재 질문 표시
-        if current_idx < len(QUESTIONS):
-            current_q = QUESTIONS[current_idx]
-            st.markdown(f"**질문 {current_idx + 1}/{len(QUESTIONS)}**")
-            st.markdown(f"**{current_q['text']}**")
-            
-            # 질문별 폼
-            with st.form(f"question_form_{current_q['id']}"):
-                response = st.text_area(
-                    label="응답",
-                    key=f"response_{current_q['id']}",
-                    height=200,
-                    label_visibility="collapsed",
-                    placeholder="여기에 응답을 입력하세요..."
-                )
-                
-                submitted = st.form_submit_button("제출하기", type="primary", use_container_width=True)
-                
-                if submitted:
-                    if not response.strip():
-                        st.warning("응답을 입력해주세요.")
-                    else:
-                        # 응답 저장
-                        st.session_state.responses[current_q['id']] = response
-                        
-                        # 다음 질문으로 이동
-                        if current_idx < len(QUESTIONS) - 1:
-                            st.session_state.current_question_idx += 1
-                            st.rerun()
-                        else:
-                            # 모든 질문 완료
-                            if st.session_state.questions_start_time:
-                                questions_duration = (datetime.now() - st.session_state.questions_start_time).total_seconds()
-                                st.session_state.questions_time = questions_duration
-                            st.session_state.page = 'complete'
-                            st.rerun()
+        if CLIENT_QUESTION_RUNNER:
+            render_question_runner()
         else:
-            # 모든 질문 완료 (이 경우는 발생하지 않아야 함)
-            st.session_state.page = 'complete'
-            st.rerun()
+            render_question_pane()
 
-def render_complete_page():
-    """완료 페이지"""
-    # 전체 소요 시간 계산
+# 질문 진행 컴포넌트가 보내는 질문별 시간 필드 (모두 0 이상의 밀리초)
+RUNNER_TIME_FIELDS = ('shown_at', 'submitted_at', 'first_input_ms', 'submit_ms')
+
+def _runner_number(value):
+    """0 이상의 유한한 숫자면 float, 아니면 None (bool, 문자열, NaN 등은 버림)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    return value if math.isfinite(value) and value >= 0 else None
+
+def parse_runner_result(result):
+    """질문 진행 컴포넌트 결과 검증 → (응답, 질문별 시간)
+
+    알 수 있는 질문 id의 값만 남기고, 응답은 비어 있지 않은 문자열, 시간은 0 이상의 숫자만 받습니다.
+    응답이 빠진 질문이 있으면 ValueError (컴포넌트가 보낸 값은 조작될 수 있음)
+    """
+    if not isinstance(result, dict):
+        raise ValueError("응답 형식이 올바르지 않습니다.")
+    raw_responses = result.get('responses')
+    raw_times = result.get('times')
+    raw_responses = raw_responses if isinstance(raw_responses, dict) else {}
+    raw_times = raw_times if isinstance(raw_times, dict) else {}
+
+    responses, times = {}, {}
+    for q in QUESTIONS:
+        qid = q['id']
+        answer = raw_responses.get(qid)
+        if isinstance(answer, str) and answer.strip():
+            responses[qid] = answer
+        fields = raw_times.get(qid)
+        fields = fields if isinstance(fields, dict) else {}
+        times[qid] = {name: _runner_number(fields.get(name)) for name in RUNNER_TIME_FIELDS}
+
+    missing = [q['id'] for q in QUESTIONS if q['id'] not in responses]
+    if missing:
+        raise ValueError(f"응답이 없는 질문이 있습니다: {', '.join(missing)}")
+    return responses, times
+
+def render_question_runner():
+    """과제 페이지 오른쪽 열 (브라우저 진행 컴포넌트, 응답 전체를 한 번에 받음)"""
+    st.markdown("### ✏️ 질문")
+    # 진행 중에는 서버가 다시 실행되지 않으므로 안내문은 계속 표시
+    render_question_intro()
+    if st.session_state.runner_error:
+        st.error(st.session_state.runner_error)
+
+    # 시도 번호가 바뀌면 컴포넌트 키와 브라우저 저장 상태가 모두 새로 시작됨
+    attempt = st.session_state.runner_attempt
+    result = sst_assets.question_runner(
+        QUESTIONS, session=f"{st.session_state.submission_id}-{attempt}", key=f"question_runner_{attempt}"
+    )
+    if not result:
+        return
+
+    try:
+        responses, times = parse_runner_result(result)
+    except ValueError as e:
+        # 컴포넌트는 이미 완료 상태이므로 처음부터 다시 진행하게 함
+        st.session_state.runner_attempt += 1
+        st.session_state.runner_error = f"{e} 처음 질문부터 다시 응답해 주세요."
+        st.rerun()
+
+    st.session_state.runner_error = None
+    st.session_state.responses.update(responses)
+    st.session_state.question_times = times
+    # 반응 시간: 브라우저 performance.now() 기준 (서버 재실행, 네트워크 지연 없음)
+    for qid, fields in times.items():
+        st.session_state.question_rt[qid] = fields['submit_ms']
+        st.session_state.question_rt[f"{qid}_first"] = fields['first_input_ms']
+    # 질문 소요 시간: 첫 질문 표시 ~ 마지막 제출 (브라우저 시각 기준, 네트워크 지연 제외)
+    first = times[QUESTIONS[0]['id']]['shown_at']
+    last = times[QUESTIONS[-1]['id']]['submitted_at']
+    if first is not None and last is not None and last >= first:
+        st.session_state.questions_time = (last - first) / 1000
+    elif st.session_state.questions_start_time:
+        st.session_state.questions_time = (datetime.now() - st.session_state.questions_start_time).total_seconds()
+    st.session_state.page = 'complete'
+    st.rerun()
+
+@st.fragment
+def render_question_pane():
+    """과제 페이지 오른쪽 열 (질문 하나와 응답 폼)
+
+    fragment로 분리되어 있어 제출해도 이 열만 다시 실행됩니다.
+    왼쪽 소설 본문과 전역 CSS는 다시 보내지 않으며, 마지막 질문 뒤에만 앱 전체를 다시 실행합니다.
+    """
+    st.markdown("### ✏️ 질문")
+
+    current_idx = st.session_state.current_question_idx
+    if current_idx >= len(QUESTIONS):
+        # 모든 질문 완료 (이 경우는 발생하지 않아야 함)
+        st.session_state.page = 'complete'
+        st.rerun()
+
+    # 첫 질문일 때만 안내문 표시 (fragment 안에 있어 다음 질문으로 넘어가면 사라짐)
+    if current_idx == 0:
+        render_question_intro()
+
+    # 현재 질문 표시
+    current_q = QUESTIONS[current_idx]
+    st.markdown(f"**질문 {current_idx + 1}/{len(QUESTIONS)}**")
+    st.markdown(f"**{current_q['text']}**")
+
+    # 질문별 폼
+    with st.form(f"question_form_{current_q['id']}"):
+        response = st.text_area(
+            label="응답",
+            key=f"response_{current_q['id']}",
+            height=200,
+            label_visibility="collapsed",
+            placeholder="여기에 응답을 입력하세요..."
+        )
+
+        submitted = st.form_submit_button("제출하기", type="primary", use_container_width=True)
+
+        if submitted:
+            if not response.strip():
+                st.warning("응답을 입력해주세요.")
+            else:
+                # 응답 저장
+                st.session_state.responses[current_q['id']] = response
+
+                # 다음 질문으로 이동 (오른쪽 열만 다시 실행)
+                if current_idx < len(QUESTIONS) - 1:
+                    st.session_state.current_question_idx += 1
+                    st.rerun(scope="fragment")
+                else:
+                    # 모든 질문 완료 → 완료 페이지로 (앱 전체 재실행)
+                    if st.session_state.questions_start_time:
+                        questions_duration = (datetime.now() - st.session_state.questions_start_time).total_seconds()
+                        st.session_state.questions_time = questions_duration
+                    st.session_state.page = 'complete'
+                    st.rerun()
+
+def save_submission():
+    """완료된 세션을 한 번만 저장 (재실행되어도 중복 저장하지 않음)"""
+    if st.session_state.submission_saved:
+        return
+
+    # 전체 소요 시간 계산 (처음 완료 페이지에 도달한 시점 기준)
     if st.session_state.start_time:
         total_time = (datetime.now() - st.session_state.start_time).total_seconds()
     else:
@@ -771,21 +741,46 @@ def render_complete_page():
         'total_time': total_time
     }
 
-    st.title("과제 완료")
+    row = build_response_row(
+        st.session_state.participant_info,
+        st.session_state.responses,
+        st.session_state.pre_story_responses,
+        timing,
+        rt=st.session_state.question_rt
+    )
+    submission_id = st.session_state.submission_id
 
-    # Google Sheets에 저장 (사용자에게 저장 결과 메시지 표시 안 함)
-    if check_google_sheets_config():
-        with st.spinner("응답을 저장하는 중..."):
-            success, message = save_to_google_sheets(
-                st.session_state.participant_info,
-                st.session_state.responses,
-                st.session_state.pre_story_responses,
-                timing
-            )
-        # 저장 성공/실패 메시지는 표시하지 않음
-        if not success:
-            st.error(f"저장 중 오류 발생: {message}")
+    # 저장소(기본: Google Sheets)에 저장 (사용자에게 저장 결과 메시지 표시 안 함)
+    if check_storage_config():
+        try:
+            # 로컬 스풀에 먼저 기록하고, 백그라운드 워커가 모아서 저장소에 업로드
+            # (같은 제출 ID는 스풀의 중복 인덱스에서 걸러짐)
+            get_write_queue().submit(row, timeout=WRITE_SUBMIT_TIMEOUT_SEC, submission_id=submission_id)
+            st.session_state.submission_saved = True
+        except Exception:
+            # 로컬 스풀에 기록할 수 없는 경우에만 직접 저장
+            with st.spinner("응답을 저장하는 중..."):
+                success, message = save_rows_to_storage([row])
+            # 저장 성공/실패 메시지는 표시하지 않음
+            if success:
+                st.session_state.submission_saved = True
+            else:
+                st.error(f"저장 중 오류 발생: {message}")
     else:
+        # Sheets가 없어도 응답은 로컬 스풀에 보관 (설정 후 자동 업로드)
+        try:
+            get_submission_spool().add(row, submission_id=submission_id)
+            st.session_state.submission_saved = True
+        except Exception as e:
+            st.error(f"로컬 저장 중 오류 발생: {e}")
+
+def render_complete_page():
+    """완료 페이지"""
+    st.title("과제 완료")
+
+    save_submission()
+
+    if not check_storage_config():
         st.warning("Google Sheets가 설정되지 않았습니다. 로컬 테스트 모드입니다.")
         st.info("배포 시 Streamlit secrets에 Google 서비스 계정 정보를 설정하세요.")
 
@@ -813,81 +808,8 @@ def main():
         initial_sidebar_state="collapsed"  # 사이드바 기본 닫힘
     )
     
-    # 테마 규칙: 라이트는 전체 검정, 다크는 전체 흰색
-    st.markdown("""
-        <style>
-        /* 기본값: 전체 검정 */
-        .stApp,
-        .stApp * {
-            color: #111111 !important;
-        }
-
-        /* 앱이 라이트 모드일 때: 전체 검정 */
-        html[data-theme="light"] .stApp,
-        html[data-theme="light"] .stApp *,
-        [data-theme="light"] .stApp,
-        [data-theme="light"] .stApp *,
-        .stApp[data-theme="light"],
-        .stApp[data-theme="light"] * {
-            color: #111111 !important;
-        }
-
-        /* 앱이 다크 모드일 때: 전체 흰색 */
-        html[data-theme="dark"] .stApp,
-        html[data-theme="dark"] .stApp *,
-        [data-theme="dark"] .stApp,
-        [data-theme="dark"] .stApp *,
-        .dark .stApp,
-        .dark .stApp *,
-        .stApp[data-theme="dark"],
-        .stApp[data-theme="dark"] * {
-            color: #ffffff !important;
-        }
-
-        /* 시스템 모드는 앱 테마가 명시되지 않은 경우에만 적용 */
-        @media (prefers-color-scheme: light) {
-            html:not([data-theme]) .stApp,
-            html:not([data-theme]) .stApp * {
-                color: #111111 !important;
-            }
-        }
-
-        /* 시스템 다크 모드도 앱 테마가 명시되지 않은 경우에만 적용 */
-        @media (prefers-color-scheme: dark) {
-            html:not([data-theme]) .stApp,
-            html:not([data-theme]) .stApp * {
-                color: #ffffff !important;
-            }
-        }
-
-        /* 다크 모드에서 입력 컴포넌트 배경만 대비 유지 */
-        html[data-theme="dark"] .stApp input,
-        html[data-theme="dark"] .stApp textarea,
-        [data-theme="dark"] .stApp input,
-        [data-theme="dark"] .stApp textarea,
-        .stApp[data-theme="dark"] input,
-        .stApp[data-theme="dark"] textarea,
-        html[data-theme="dark"] .stApp [data-baseweb="select"] > div,
-        [data-theme="dark"] .stApp [data-baseweb="select"] > div,
-        .stApp[data-theme="dark"] [data-baseweb="select"] > div {
-            background-color: #18181b !important;
-            border-color: #3f3f46 !important;
-        }
-        html[data-theme="dark"] .story-body,
-        [data-theme="dark"] .story-body,
-        .dark .story-body,
-        .stApp[data-theme="dark"] .story-body {
-            background-color: #27272a !important;
-            border-color: #3f3f46 !important;
-        }
-        @media (prefers-color-scheme: dark) {
-            html:not([data-theme]) .story-body {
-                background-color: #27272a !important;
-                border-color: #3f3f46 !important;
-            }
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    # 테마 규칙: 라이트는 전체 검정, 다크는 전체 흰색 (assets/theme.css, 브라우저 캐시)
+    sst_assets.install_styles()
 
     # 세션 상태 초기화
     init_session_state()
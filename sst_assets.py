@@ -0,0 +1,87 @@
+"""
+정적 자원 (assets/)
+소설 본문과 전역 CSS를 매 재실행마다 웹소켓으로 다시 보내지 않고, 브라우저가 캐시하는 정적 파일로 제공합니다.
+
+- theme.css / story.css: 앱 문서의 <head>에 <link>로 한 번만 연결 (주소에 내용 해시)
+- story.<해시>.json: 소설 본문 HTML, 내용 해시가 파일 이름에 들어 있어 바뀌면 새 파일이 됨
+- index.html: 위 파일을 불러오는 Streamlit 컴포넌트 (재실행 때는 인자 몇 개만 전송)
+- runner.css: 질문 진행 컴포넌트(question_runner) 스타일
+
+컴포넌트 경로의 .html 외 파일은 Streamlit이 Cache-Control: public으로 제공합니다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+
+# 앱 문서에 연결하는 스타일시트
+STYLESHEETS = ("theme.css", "story.css", "forms.css")
+
+# 해시 앞부분 길이 (파일 이름/주소용)
+HASH_LENGTH = 12
+
+_component = components.declare_component("sst_assets", path=str(ASSETS_DIR))
+
+
+def content_hash(data):
+    """bytes 또는 str → 내용 해시 (sha256 앞 HASH_LENGTH자리)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+@lru_cache(maxsize=None)
+def asset_url(name):
+    """assets/ 파일 이름 → 내용 해시를 붙인 컴포넌트 기준 상대 주소 (파일이 바뀌면 주소도 바뀜)"""
+    return f"{name}?v={content_hash((ASSETS_DIR / name).read_bytes())}"
+
+
+def publish_story(html):
+    """소설 본문 HTML을 assets/story.<해시>.json으로 저장하고 상대 주소 반환 (같은 내용이면 다시 쓰지 않음)"""
+    payload = json.dumps({'html': html}, ensure_ascii=False)
+    name = f"story.{content_hash(payload)}.json"
+    path = ASSETS_DIR / name
+    if not path.exists():
+        # 여러 프로세스가 동시에 만들어도 반쯤 쓴 파일이 보이지 않도록 임시 파일 후 교체
+        fd, tmp = tempfile.mkstemp(dir=ASSETS_DIR, prefix=".story-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    return name
+
+
+def install_styles(key="sst_styles"):
+    """STYLESHEETS를 앱 문서의 <head>에 연결 (높이 0, 이미 연결되어 있으면 아무것도 하지 않음)"""
+    _component(mode="styles", hrefs=[asset_url(name) for name in STYLESHEETS], key=key, default=None)
+
+
+def story_view(src, variant="page", key=None):
+    """publish_story()로 만든 소설 본문 표시
+
+    variant: 'page' (소설 읽기 페이지) | 'pane' (과제 페이지 왼쪽 열)
+    """
+    _component(mode="story", src=src, variant=variant, key=key, default=None)
+
+
+def question_runner(questions, session, key="question_runner"):
+    """질문 목록을 브라우저에서 차례로 진행하고, 모두 끝나면 결과 반환 (그 전에는 None)
+
+    진행 중에는 서버로 아무것도 보내지 않으며, 진행 상태는 브라우저 localStorage(session별)에 남습니다.
+    결과: {'responses': {질문 ID: 응답}, 'times': {질문 ID: {'shown_at', 'submitted_at', 'first_input_ms', 'submit_ms'}}}
+    shown_at/submitted_at은 브라우저 기준 Unix epoch 밀리초,
+    first_input_ms/submit_ms는 질문 표시부터 첫 입력/제출까지의 performance.now() 간격(밀리초, 입력이 없으면 None)
+    """
+    return _component(
+        mode="runner", session=session, key=key, default=None,
+        questions=[{'id': q['id'], 'text': q['text']} for q in questions]
+    )
@@ -0,0 +1,165 @@
+"""
+SST 응답 시트 스키마
+앱, 스크립트(reset_sheets.py, generate_simulation.py), 채점/내보내기 모듈이 함께 쓰는 열 정의입니다.
+열 구성을 바꿀 때는 이 파일만 고치고 SCHEMA_VERSION을 올립니다.
+
+    row = ENCODER.encode(participant=..., pre_story=..., responses=..., timing=..., rt=...)
+    HEADERS[COLUMN_INDEX['response_S1']]
+"""
+from datetime import datetime
+from operator import itemgetter
+
+# 열 구성이 바뀔 때마다 1씩 올림
+# 2: 문항별 반응 시간 열 rt_<QID>_first, rt_<QID> 추가
+SCHEMA_VERSION = 2
+
+# Google Sheets 스프레드시트 이름
+GOOGLE_SHEETS_NAME = "SST_Responses"
+
+# 앱이 기록하는 timestamp 형식
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 응답 문항 (id, 유형) - 질문 문구는 sst_app.py의 QUESTION_TEXTS
+# type: "spontaneous" (자발적 추론), "mental_state" (정신상태 추론), "comprehension" (이해력)
+QUESTIONS = [
+    {"id": "S1", "type": "spontaneous"},
+    {"id": "C1", "type": "comprehension"},
+    {"id": "C2", "type": "comprehension"},
+    {"id": "C3", "type": "comprehension"},
+    {"id": "C4", "type": "comprehension"},
+    {"id": "M1", "type": "mental_state"},
+    {"id": "M2", "type": "mental_state"},
+    {"id": "M3", "type": "mental_state"},
+    {"id": "M4", "type": "mental_state"},
+    {"id": "M5", "type": "mental_state"},
+    {"id": "M6", "type": "mental_state"},
+    {"id": "M7", "type": "mental_state"},
+    {"id": "M8", "type": "mental_state"},
+    {"id": "C5", "type": "comprehension"},
+]
+QUESTION_IDS = [q['id'] for q in QUESTIONS]
+
+# 선택지가 정해진 사전 질문 ("선택하세요"는 저장되지 않음)
+CHOICES = {
+    'read_before': ("예", "아니오"),
+    'familiar': ("예", "아니오"),
+    'read_context': ("취미", "학교", "기타"),
+}
+
+# 행을 만들 때 값을 가져오는 곳 (ENCODER.encode의 인자 이름)
+SOURCES = ('meta', 'participant', 'timing', 'pre_story', 'responses', 'rt')
+
+# 열 정의: (열 이름, 값 출처, 출처 딕셔너리의 키)
+COLUMNS = [
+    ('timestamp', 'meta', 'timestamp'),
+    ('participant_id', 'participant', 'id'),
+    ('story_read_time_sec', 'timing', 'story_read_time'),
+    ('questions_time_sec', 'timing', 'questions_time'),
+    ('total_time_sec', 'timing', 'total_time'),
+    ('read_before', 'pre_story', 'read_before'),
+    ('read_when', 'pre_story', 'read_when'),
+    ('read_memory', 'pre_story', 'read_memory'),
+    ('read_context', 'pre_story', 'read_context'),
+    ('read_context_other', 'pre_story', 'read_context_other'),
+    ('read_grade', 'pre_story', 'read_grade'),
+    ('read_class', 'pre_story', 'read_class'),
+    ('familiar', 'pre_story', 'familiar'),
+    ('familiar_knowledge', 'pre_story', 'familiar_knowledge'),
+    ('familiar_discussion', 'pre_story', 'familiar_discussion'),
+] + [(f"response_{qid}", 'responses', qid) for qid in QUESTION_IDS] + [
+    # 문항별 반응 시간 (밀리초, 질문 표시 시점부터): 첫 입력까지, 제출까지
+    # 브라우저 진행 컴포넌트(기본값)에서 측정, 대체 경로인 서버 폼(SST_CLIENT_RUNNER=0)으로 진행하면 빈 칸
+    column for qid in QUESTION_IDS
+    for column in ((f"rt_{qid}_first", 'rt', f"{qid}_first"), (f"rt_{qid}", 'rt', qid))
+]
+
+# 시트 헤더 (1행)
+HEADERS = [name for name, _, _ in COLUMNS]
+
+# 열 이름 → 0부터 센 열 번호
+COLUMN_INDEX = {name: i for i, name in enumerate(HEADERS)}
+
+# 없어도 되는 뒤쪽 열: 이 열이 추가되기 전(v1) 시트에도 앱은 이 열 없이 계속 저장
+# (migrate_sheets.py를 실행하면 열이 생기고 이후 행부터 값이 기록됨)
+OPTIONAL_COLUMNS = tuple(name for name, source, _ in COLUMNS if source == 'rt')
+
+# 숫자로 저장되는 열 (소요 시간, 반응 시간)
+NUMERIC_COLUMNS = frozenset(name for name, source, _ in COLUMNS if source in ('timing', 'rt'))
+
+
+def _timing(value):
+    # 시간(초)은 문자열이 아닌 숫자로 저장 (소수 첫째 자리)
+    return round(value or 0, 1)
+
+
+def _latency(value):
+    # 반응 시간(밀리초)은 측정하지 못했으면 0이 아닌 빈 칸
+    return '' if value is None else round(value, 1)
+
+
+def _text(value):
+    return '' if value is None else value
+
+
+# 출처별 값 변환
+CONVERTERS = {
+    'meta': _text,
+    'participant': _text,
+    'timing': _timing,
+    'pre_story': _text,
+    'responses': _text,
+    'rt': _latency,
+}
+
+
+class RowEncoder:
+    """세션 값 → 시트 한 행 변환기
+
+    열마다 (출처 번호, 키, 변환 함수)를 미리 계산해 두므로 행 하나를 한 번의 순회로 만듭니다.
+    """
+
+    def __init__(self, columns=COLUMNS):
+        self.headers = [name for name, _, _ in columns]
+        self._plan = [(SOURCES.index(source), key, CONVERTERS[source]) for _, source, key in columns]
+        self._converters = [CONVERTERS[source] for _, source, _ in columns]
+
+    def encode(self, participant=None, pre_story=None, responses=None, timing=None, timestamp=None, rt=None):
+        """rt: 문항별 반응 시간(밀리초) {QID: 제출까지, 'QID_first': 첫 입력까지}"""
+        meta = {'timestamp': timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)}
+        sources = (meta, participant or {}, timing or {}, pre_story or {}, responses or {}, rt or {})
+        return [convert(sources[source].get(key)) for source, key, convert in self._plan]
+
+    def encode_record(self, record):
+        """열 이름 → 값 딕셔너리(예: DataFrame 한 행)를 시트 한 행으로 변환 (None은 결측)"""
+        return [convert(record.get(name)) for name, convert in zip(self.headers, self._converters)]
+
+
+ENCODER = RowEncoder()
+
+
+def projector(names, headers=HEADERS):
+    """headers 순서의 행에서 names 열만 골라 내는 함수 (행 → 목록)"""
+    index = COLUMN_INDEX if headers is HEADERS else {name: i for i, name in enumerate(headers)}
+    missing = [name for name in names if name not in index]
+    if missing:
+        raise KeyError(f"헤더에 없는 열: {missing}")
+    if len(names) == 1:
+        position = index[names[0]]
+        return lambda row: [row[position]]
+    getter = itemgetter(*(index[name] for name in names))
+    return lambda row: list(getter(row))
+
+
+def build_questions(texts):
+    """문항 id → 질문 문구 딕셔너리로 화면용 질문 목록 생성 ({"id", "type", "text"}, QUESTIONS 순서)
+
+    문구가 없거나 QUESTIONS에 없는 id가 있으면 ValueError
+    """
+    missing = [qid for qid in QUESTION_IDS if qid not in texts]
+    unknown = [qid for qid in texts if qid not in QUESTION_IDS]
+    if missing or unknown:
+        raise ValueError(
+            f"질문 문구가 sst_schema.QUESTIONS와 맞지 않습니다. 문항을 바꿀 때는 sst_schema.py를 함께 고치고 "
+            f"SCHEMA_VERSION을 올리세요. (문구 없음: {missing}, 스키마에 없음: {unknown})"
+        )
+    return [dict(q, text=texts[q['id']]) for q in QUESTIONS]
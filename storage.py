@@ -0,0 +1,489 @@
+"""
+응답 저장소 백엔드
+Google Sheets, SQLite, Parquet, 메모리 저장소를 같은 인터페이스로 다룹니다.
+
+    backend = create_backend({'backend': 'sqlite', 'path': 'data/responses.sqlite3'})
+    backend.ensure_schema(HEADERS)
+    backend.append_many(rows)
+
+행 번호는 헤더를 제외한 데이터 행 기준 0부터 셉니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import sheets_client
+from sheets_client import HeaderMismatchError
+from sheets_writer import AMBIGUOUS_STATUS, APPEND_RETRYABLE_STATUS, get_default_writer, status_code
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+try:
+    import gspread
+    from gspread.utils import rowcol_to_a1
+    GSPREAD_AVAILABLE = True
+except ImportError:
+    GSPREAD_AVAILABLE = False
+
+
+class StorageError(Exception):
+    """저장소를 열거나 쓸 수 없을 때 발생"""
+
+
+class StorageBackend:
+    """응답 저장소 공통 인터페이스"""
+
+    def ensure_schema(self, headers, optional=()):
+        """헤더를 확인하고, 비어 있는 저장소면 헤더를 만듦 (불일치 시 HeaderMismatchError)
+
+        optional: 기존 저장소에 없어도 되는 headers 뒤쪽 열 (없으면 그 열을 빼고 저장)
+        """
+        raise NotImplementedError
+
+    def read_headers(self):
+        """현재 헤더 목록 (비어 있는 저장소면 빈 목록)"""
+        raise NotImplementedError
+
+    def read_all_headers(self):
+        """응답 열 뒤의 채점 결과 열까지 포함한 헤더 목록 (그런 열이 없는 저장소는 read_headers()와 같음)"""
+        return self.read_headers()
+
+    def append_many(self, rows):
+        """여러 행을 한 번에 추가"""
+        raise NotImplementedError
+
+    def read_range(self, start, stop=None, width=None):
+        """데이터 행 [start, stop) 읽기 (stop이 None이면 끝까지)
+
+        width: 읽을 열 수 (기본은 응답 열). read_all_headers()의 길이를 주면 채점 결과 열까지 읽음
+        (채점 결과 열이 없는 저장소는 응답 열만 반환)
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """헤더를 포함한 모든 행 삭제"""
+        raise NotImplementedError
+
+    def write_columns(self, columns, blocks):
+        """응답 열 뒤에 columns 열을 두고 blocks [(시작 행, 값 행 목록), ...]을 기록 (채점 결과용)"""
+        raise StorageError(f"{type(self).__name__}는 채점 결과 열 쓰기를 지원하지 않습니다.")
+
+    def iter_rows(self, chunk_size=1000, start=0):
+        """데이터 행을 chunk_size개씩 읽으며 한 행씩 반환"""
+        while True:
+            chunk = self.read_range(start, start + chunk_size)
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            start += chunk_size
+
+
+def _require_headers(headers):
+    # 헤더가 없으면 행을 어느 열에 둘지 알 수 없어 조용히 버려지므로 거부
+    if not headers:
+        raise StorageError("저장소에 헤더가 없습니다. append_many 전에 ensure_schema(HEADERS)를 호출하세요.")
+
+
+def _check_headers(existing, headers, optional=()):
+    if not sheets_client.headers_compatible(existing, headers, optional):
+        missing = [h for h in headers if h not in existing]
+        extra = [h for h in existing if h not in headers]
+        raise HeaderMismatchError(
+            f"저장소 헤더가 현재 질문 구성과 다릅니다 (누락: {missing}, 추가: {extra})"
+        )
+
+
+class MemoryBackend(StorageBackend):
+    """프로세스 메모리 저장소 (테스트/벤치마크용)"""
+
+    def __init__(self):
+        self.headers = []
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def ensure_schema(self, headers, optional=()):
+        with self._lock:
+            if not self.headers:
+                self.headers = list(headers)
+            else:
+                _check_headers(self.headers, headers, optional)
+
+    def read_headers(self):
+        with self._lock:
+            return list(self.headers)
+
+    def append_many(self, rows):
+        _require_headers(self.headers)
+        width = len(self.headers)
+        with self._lock:
+            self.rows.extend((list(row) + [''] * width)[:width] for row in rows)
+
+    def read_range(self, start, stop=None, width=None):
+        with self._lock:
+            return [list(row) for row in self.rows[start:stop]]
+
+    def clear(self):
+        with self._lock:
+            self.headers = []
+            self.rows = []
+
+
+class SQLiteBackend(StorageBackend):
+    """로컬 SQLite 저장소 (WAL 모드, 모든 값은 문자열로 저장)"""
+
+    def __init__(self, path, table='responses'):
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._headers = self._read_headers()
+
+    def _read_headers(self):
+        columns = [info[1] for info in self._conn.execute(f'PRAGMA table_info("{self.table}")')]
+        return [c for c in columns if c != '_row']
+
+    def ensure_schema(self, headers, optional=()):
+        with self._lock:
+            if not self._headers:
+                columns = ', '.join(f'"{h}" TEXT' for h in headers)
+                self._conn.execute(
+                    f'CREATE TABLE "{self.table}" (_row INTEGER PRIMARY KEY AUTOINCREMENT, {columns})'
+                )
+                self._headers = list(headers)
+            else:
+                _check_headers(self._headers, headers, optional)
+
+    def read_headers(self):
+        with self._lock:
+            self._headers = self._read_headers()
+            return list(self._headers)
+
+    def append_many(self, rows):
+        _require_headers(self._headers)
+        placeholders = ', '.join('?' for _ in self._headers)
+        columns = ', '.join(f'"{h}"' for h in self._headers)
+        width = len(self._headers)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                f'INSERT INTO "{self.table}" ({columns}) VALUES ({placeholders})',
+                [[None if v is None else str(v) for v in (list(row) + [''] * width)[:width]] for row in rows]
+            )
+            self._conn.execute("COMMIT")
+
+    def read_range(self, start, stop=None, width=None):
+        limit = -1 if stop is None else max(0, stop - start)
+        columns = ', '.join(f'"{h}"' for h in self._headers)
+        if not columns:
+            return []
+        with self._lock:
+            cursor = self._conn.execute(
+                f'SELECT {columns} FROM "{self.table}" ORDER BY _row LIMIT ? OFFSET ?',
+                (limit, start)
+            )
+            return [['' if v is None else v for v in row] for row in cursor]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+            self._headers = []
+
+
+class ParquetBackend(StorageBackend):
+    """로컬 Parquet 저장소: append_many 호출마다 part 파일 하나 (모든 값은 문자열)"""
+
+    def __init__(self, directory):
+        if not PARQUET_AVAILABLE:
+            raise StorageError("pyarrow가 설치되어 있지 않습니다.")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._schema_path = self.directory / '_schema.json'
+        self._lock = threading.Lock()
+
+    def _headers(self):
+        if not self._schema_path.exists():
+            return []
+        return json.loads(self._schema_path.read_text(encoding='utf-8'))['headers']
+
+    def _parts(self):
+        return sorted(self.directory.glob('part-*.parquet'))
+
+    def ensure_schema(self, headers, optional=()):
+        with self._lock:
+            existing = self._headers()
+            if not existing:
+                self._schema_path.write_text(
+                    json.dumps({'headers': list(headers)}, ensure_ascii=False), encoding='utf-8'
+                )
+            else:
+                _check_headers(existing, headers, optional)
+
+    def read_headers(self):
+        with self._lock:
+            return self._headers()
+
+    def append_many(self, rows):
+        rows = [list(row) for row in rows]
+        if not rows:
+            return
+        with self._lock:
+            headers = self._headers()
+            _require_headers(headers)
+            columns = {
+                h: [None if i >= len(row) or row[i] is None else str(row[i]) for row in rows]
+                for i, h in enumerate(headers)
+            }
+            table = pa.table({h: pa.array(columns[h], type=pa.string()) for h in headers})
+            parts = self._parts()
+            next_index = int(parts[-1].stem.split('-')[1]) + 1 if parts else 0
+            pq.write_table(table, self.directory / f'part-{next_index:06d}.parquet')
+
+    def read_range(self, start, stop=None, width=None):
+        rows = []
+        offset = 0
+        for part in self._parts():
+            if stop is not None and offset >= stop:
+                break
+            num_rows = pq.read_metadata(part).num_rows
+            if offset + num_rows > start:
+                table = pq.read_table(part)
+                lo = max(0, start - offset)
+                hi = num_rows if stop is None else min(num_rows, stop - offset)
+                columns = [table.column(i).to_pylist()[lo:hi] for i in range(table.num_columns)]
+                rows.extend(['' if v is None else v for v in row] for row in zip(*columns))
+            offset += num_rows
+        return rows
+
+    def clear(self):
+        with self._lock:
+            for part in self._parts():
+                part.unlink()
+            if self._schema_path.exists():
+                self._schema_path.unlink()
+
+
+class SheetsBackend(StorageBackend):
+    """Google Sheets 저장소 (공용 클라이언트/워크시트 핸들과 쿼터 인식 호출기 사용)"""
+
+    def __init__(self, credentials_info, spreadsheet_name, writer=None):
+        if not GSPREAD_AVAILABLE:
+            raise StorageError("gspread가 설치되어 있지 않습니다.")
+        self.credentials_info = credentials_info
+        self.spreadsheet_name = spreadsheet_name
+        self.writer = writer or get_default_writer()
+        self._headers = None
+
+    @property
+    def worksheet(self):
+        try:
+            return sheets_client.get_worksheet(self.credentials_info, self.spreadsheet_name)
+        except gspread.SpreadsheetNotFound as e:
+            raise StorageError(f"스프레드시트 '{self.spreadsheet_name}'를 찾을 수 없습니다.") from e
+
+    def ensure_schema(self, headers, optional=()):
+        # 시트에 optional 열이 없으면 그 열을 뺀 헤더가 돌아오고, 이후 append_many가 행을 그 폭으로 자름
+        self._headers = sheets_client.ensure_header(self.worksheet, headers, writer=self.writer, optional=optional)
+
+    def read_headers(self):
+        self._headers = sheets_client.data_headers(self.writer.row_values(self.worksheet, 1))
+        return list(self._headers)
+
+    def read_all_headers(self):
+        # score_pipeline.py가 응답 열 뒤에 쓴 채점 결과 열 포함 (뒤쪽 빈 헤더 칸은 제외)
+        row1 = list(self.writer.row_values(self.worksheet, 1))
+        while row1 and not row1[-1]:
+            row1.pop()
+        self._headers = sheets_client.data_headers(row1)
+        return row1
+
+    def append_many(self, rows):
+        rows = [list(row) for row in rows]
+        if not rows:
+            return
+        # ensure_schema 전이면 1행을 읽어 확인 (헤더 없는 시트에는 쓰지 않음)
+        width = self._width()
+        _require_headers(self._headers)
+        # 응답 열 폭에 맞춤 (없는 optional 열 값이 뒤쪽 채점 결과 열에 들어가지 않도록)
+        rows = [row[:width] for row in rows]
+        try:
+            self.writer.append_rows(self.worksheet, rows)
+        except Exception as e:
+            # 500/502/504는 행이 이미 기록된 뒤 응답만 실패했을 수 있음 → 다시 올리면 중복되므로 확인
+            if status_code(e) in AMBIGUOUS_STATUS and self._rows_landed(rows):
+                return
+            # 시트가 삭제/교체된 경우를 대비해 캐시된 핸들 폐기
+            sheets_client.invalidate(self.spreadsheet_name)
+            raise
+
+    def _rows_landed(self, rows):
+        """rows가 모두 시트에 있는지 (timestamp, participant_id) 두 열로 확인 (확인 실패 시 False)"""
+        try:
+            existing = self.writer.call(self.worksheet.get, 'A2:B', kind='read')
+        except Exception:
+            return False
+        keys = {tuple(str(v) for v in (list(row) + ['', ''])[:2]) for row in existing}
+        return all(tuple(str(v) for v in (row + ['', ''])[:2]) in keys for row in rows)
+
+    def _width(self):
+        # 응답 열만 (뒤에 붙은 채점 결과 열 제외)
+        if self._headers is None:
+            self._headers = sheets_client.data_headers(self.writer.row_values(self.worksheet, 1))
+        return len(self._headers)
+
+    def read_range(self, start, stop=None, width=None):
+        width = width or self._width()
+        if width == 0:
+            return []
+        if stop is not None and stop <= start:
+            return []
+        last_col = rowcol_to_a1(1, width).rstrip('0123456789')
+        # 시트의 1행은 헤더, 데이터 행 0은 시트의 2행
+        cell_range = f"A{start + 2}:{last_col}" + ('' if stop is None else str(stop + 1))
+        values = self.writer.call(self.worksheet.get, cell_range, kind='read')
+        # Sheets는 뒤쪽 빈 셀을 생략하므로 헤더 폭에 맞춤
+        return [list(row) + [''] * (width - len(row)) for row in values]
+
+    def write_columns(self, columns, blocks):
+        """응답 열 바로 뒤에 columns 열 블록을 한 번의 batch_update로 기록
+
+        blocks: [(시작 데이터 행, [[값, ...], ...]), ...] - 셀마다 update_cell을 부르는 대신
+        연속한 행 구간을 범위 하나로 보내므로 호출 수는 행 수가 아니라 blocks 묶음 수에 비례합니다.
+        1행의 채점 결과 헤더가 columns와 다르면 같은 호출에 헤더도 함께 씁니다.
+        """
+        worksheet = self.worksheet
+        row1 = self.writer.row_values(worksheet, 1)
+        width = len(sheets_client.data_headers(row1))
+        if width == 0:
+            raise StorageError("헤더가 없는 시트에는 채점 결과를 쓸 수 없습니다.")
+        first_col = rowcol_to_a1(1, width + 1).rstrip('0123456789')
+        last_col = rowcol_to_a1(1, width + len(columns)).rstrip('0123456789')
+
+        # 시트 격자보다 넓게 쓰면 API가 거부하므로 열을 먼저 늘림
+        # (열 추가는 멱등이 아니므로 처리되지 않은 것이 확실한 429/503만 재시도)
+        if worksheet.col_count < width + len(columns):
+            self.writer.call(worksheet.add_cols, width + len(columns) - worksheet.col_count,
+                             retry_on=APPEND_RETRYABLE_STATUS)
+
+        data = []
+        if row1[width:] != list(columns):
+            # 이전 채점 결과 열이 더 넓었다면 남는 헤더 칸은 비움
+            header = list(columns) + [''] * max(0, len(row1) - width - len(columns))
+            header_last = rowcol_to_a1(1, width + len(header)).rstrip('0123456789')
+            data.append({'range': f"{first_col}1:{header_last}1", 'values': [header]})
+        for start, values in blocks:
+            if values:
+                data.append({
+                    'range': f"{first_col}{start + 2}:{last_col}{start + len(values) + 1}",
+                    'values': [list(row) for row in values],
+                })
+        if data:
+            self.writer.call(worksheet.batch_update, data)
+
+    def clear(self):
+        self.writer.clear(self.worksheet)
+        sheets_client.invalidate(self.spreadsheet_name)
+        self._headers = None
+
+
+def load_config(secrets, spreadsheet_name):
+    """secrets의 [storage] 섹션으로 저장소 설정 구성
+
+    환경 변수 SST_STORAGE_BACKEND, SST_STORAGE_PATH가 있으면 secrets보다 우선합니다.
+    """
+    config = {'backend': 'sheets', 'spreadsheet': spreadsheet_name}
+    config.update(secrets.get('storage', {}))
+    if os.environ.get('SST_STORAGE_BACKEND'):
+        config['backend'] = os.environ['SST_STORAGE_BACKEND']
+    if os.environ.get('SST_STORAGE_PATH'):
+        config['path'] = os.environ['SST_STORAGE_PATH']
+    return config
+
+
+def open_backend(secrets, spreadsheet_name):
+    """secrets(딕셔너리 또는 st.secrets)로 설정된 저장소 백엔드 생성"""
+    config = load_config(secrets, spreadsheet_name)
+    credentials_info = None
+    if config['backend'] == 'sheets':
+        credentials_info = dict(secrets['gcp_service_account'])
+    return create_backend(config, credentials_info=credentials_info)
+
+
+def load_local_secrets(path='.streamlit/secrets.toml'):
+    """스크립트용: 로컬 secrets.toml 읽기 (없으면 빈 딕셔너리)
+
+    Python 3.11+는 표준 라이브러리 tomllib, 그 이전은 toml 패키지 사용
+    """
+    try:
+        if tomllib is not None:
+            with open(path, 'rb') as f:
+                return tomllib.load(f)
+        import toml
+        with open(path, 'r') as f:
+            return toml.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def create_backend(config, credentials_info=None, spreadsheet_name=None):
+    """설정에 따라 저장소 백엔드 생성
+
+    config['backend']: "sheets" (기본) | "sqlite" | "parquet" | "memory" | "fake_sheets"
+    config['path']: sqlite 파일 또는 parquet 디렉터리 경로
+    """
+    kind = config.get('backend', 'sheets')
+    if kind == 'sheets':
+        if credentials_info is None:
+            raise StorageError("Google 서비스 계정 정보가 없습니다.")
+        return SheetsBackend(credentials_info, config.get('spreadsheet', spreadsheet_name))
+    if kind == 'fake_sheets':
+        # 네트워크 없이 Sheets 쓰기 경로를 측정하기 위한 가짜 gspread
+        import fake_gspread
+        name = config.get('spreadsheet', spreadsheet_name)
+        server = fake_gspread.FakeServer(
+            latency_ms=float(config.get('latency_ms', 0)),
+            jitter_ms=float(config.get('jitter_ms', 0)),
+            writes_per_minute=config.get('writes_per_minute'),
+            reads_per_minute=config.get('reads_per_minute'),
+            failure_rate=float(config.get('failure_rate', 0.0))
+        )
+        fake_gspread.install(server, name)
+        return SheetsBackend({}, name)
+    if kind == 'sqlite':
+        return SQLiteBackend(config.get('path', 'data/responses.sqlite3'))
+    if kind == 'parquet':
+        return ParquetBackend(config.get('path', 'data/responses_parquet'))
+    if kind == 'memory':
+        return MemoryBackend()
+    raise StorageError(f"알 수 없는 저장소 종류: {kind}")
+
+
+def copy_rows(source, target, headers, chunk_size=500, start=0):
+    """source의 데이터 행을 target으로 chunk_size개씩 일괄 복사 (복사한 행 수 반환)
+
+    로컬 저장소로 받은 응답을 Sheets로 한꺼번에 올릴 때 사용합니다.
+    """
+    source.ensure_schema(headers)
+    target.ensure_schema(headers)
+    copied = 0
+    while True:
+        chunk = source.read_range(start + copied, start + copied + chunk_size)
+        if not chunk:
+            return copied
+        target.append_many(chunk)
+        copied += len(chunk)
+        if len(chunk) < chunk_size:
+            return copied
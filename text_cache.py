@@ -0,0 +1,266 @@
+"""
+한국어 응답 텍스트 정규화/토큰화 캐시
+응답 분석(채점, 통계)마다 반복되는 정규화 결과를 내용 해시 기준으로 기억합니다.
+같은 응답은 한 번만 처리하고, 디스크 캐시를 쓰면 다음 실행에서도 다시 처리하지 않습니다.
+
+- normalize: NFC, 문장부호 제거, 공백 정리
+- compact: normalize 결과에서 공백까지 제거 (키워드 매칭용)
+- tokens: 어절 단위로 나누고 끝의 조사 제거
+- morphemes: 형태소 분석 (kiwipiepy 설치 시)
+
+    cache = TextCache(path='data/text_cache.sqlite3')
+    cache.tokens_many(frame['response_M1'])
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from kiwipiepy import Kiwi
+    KIWI_AVAILABLE = True
+except ImportError:
+    KIWI_AVAILABLE = False
+
+# 정규화 규칙을 바꾸면 올려서 디스크 캐시의 이전 결과를 무시
+NORMALIZER_VERSION = 1
+
+# 어절 끝에서 떼어 낼 조사 (긴 것부터 검사)
+JOSA_SUFFIXES = tuple(sorted((
+    "에서는", "으로는", "에게서", "에게는", "까지는", "이라고", "라고",
+    "에서", "에게", "한테", "으로", "부터", "까지", "처럼", "보다", "하고", "이랑", "과의", "와의",
+    "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "랑",
+), key=len, reverse=True))
+
+# 한글, 영문, 숫자 외의 문자(문장부호, 기호)는 공백으로
+_PUNCT_RE = re.compile(r'[^\w\s\x00]|_')
+
+# 여러 텍스트를 이어 붙여 한 번에 정규화할 때 쓰는 구분 문자
+_SEP = '\x00'
+
+_kiwi = None
+_kiwi_lock = threading.Lock()
+
+
+def normalize(text):
+    """NFC 정규화, 문장부호 제거, 연속 공백을 한 칸으로 (결측값은 빈 문자열)"""
+    if text is None or (isinstance(text, float) and text != text):
+        return ''
+    text = unicodedata.normalize('NFC', str(text)).lower()
+    return ' '.join(_PUNCT_RE.sub(' ', text).split())
+
+
+def compact(text):
+    """normalize 후 공백까지 제거 (띄어쓰기 차이를 무시한 비교용)"""
+    return normalize(text).replace(' ', '')
+
+
+def _joined(texts):
+    """텍스트 목록을 구분 문자로 이어 붙이고 NFC/소문자/문장부호 처리를 한 번에 적용"""
+    joined = _SEP.join(texts)
+    if joined.count(_SEP) != len(texts) - 1:
+        joined = _SEP.join(text.replace(_SEP, '') for text in texts)
+    return _PUNCT_RE.sub(' ', unicodedata.normalize('NFC', joined).lower())
+
+
+def normalize_many(texts):
+    """normalize()를 문자열 목록 전체에 적용"""
+    if not texts:
+        return []
+    return [' '.join(text.split()) for text in _joined(texts).split(_SEP)]
+
+
+def compact_many(texts):
+    """compact()를 문자열 목록 전체에 적용"""
+    if not texts:
+        return []
+    return ''.join(_joined(texts).split()).split(_SEP)
+
+
+def strip_josa(word):
+    """어절 끝의 조사 하나를 떼어 냄 (어간이 한 글자 이상 남는 경우만)"""
+    for suffix in JOSA_SUFFIXES:
+        if len(word) > len(suffix) and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokens(text):
+    """어절 목록 (조사 제거)"""
+    return [strip_josa(word) for word in normalize(text).split()]
+
+
+def morphemes(text):
+    """형태소 목록 ("형태/품사"), kiwipiepy가 필요"""
+    global _kiwi
+    if not KIWI_AVAILABLE:
+        raise RuntimeError("형태소 분석에는 kiwipiepy가 필요합니다.")
+    with _kiwi_lock:
+        if _kiwi is None:
+            _kiwi = Kiwi()
+        return [f"{token.form}/{token.tag}" for token in _kiwi.tokenize(normalize(text))]
+
+
+ANALYZERS = {
+    'normalize': normalize,
+    'compact': compact,
+    'tokens': tokens,
+    'morphemes': morphemes,
+}
+
+# 목록 전체를 한 번에 처리하는 구현이 있는 분석
+BATCH_ANALYZERS = {
+    'normalize': normalize_many,
+    'compact': compact_many,
+}
+
+
+def content_hash(text):
+    """원문 내용 해시 (캐시 키)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class TextCache:
+    """분석 결과 캐시: 메모리 LRU + 선택적 SQLite 디스크 캐시
+
+    maxsize: 메모리에 유지할 최대 항목 수
+    path: 디스크 캐시 파일 (None이면 메모리만 사용)
+    """
+
+    def __init__(self, maxsize=100000, path=None):
+        self.maxsize = maxsize
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._conn = None
+        if path is not None:
+            if str(path) != ':memory:':
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS text_cache (
+                    kind TEXT NOT NULL,
+                    digest BLOB NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (kind, digest)
+                ) WITHOUT ROWID
+            """)
+
+    def _remember(self, items):
+        # 한 번에 maxsize보다 많이 들어오면 어차피 밀려날 앞부분은 건너뜀
+        self._memo.update(list(items)[-self.maxsize:])
+        while len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+
+    def _load(self, kind, digests):
+        """디스크 캐시에서 digest 목록 조회 → {digest: 값}"""
+        found = {}
+        digests = list(digests)
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            cursor = self._conn.execute(
+                f"SELECT digest, value FROM text_cache WHERE kind = ? AND digest IN ({','.join('?' * len(chunk))})",
+                [kind] + chunk
+            )
+            found.update((digest, json.loads(value)) for digest, value in cursor)
+        return found
+
+    def _store(self, kind, items):
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO text_cache (kind, digest, value) VALUES (?, ?, ?)",
+            [(kind, digest, json.dumps(value, ensure_ascii=False)) for digest, value in items]
+        )
+        self._conn.execute("COMMIT")
+
+    def analyze_many(self, kind, texts):
+        """texts 전체에 ANALYZERS[kind]를 적용한 결과 목록
+
+        같은 텍스트는 한 번만 처리하며, 메모리 → 디스크 → 계산 순으로 찾습니다.
+        메모리 캐시는 (분석 종류, 원문) 키로, 디스크 캐시는 원문의 내용 해시로 찾습니다.
+        """
+        texts = ['' if t is None or (isinstance(t, float) and t != t) else str(t) for t in texts]
+        unique = dict.fromkeys(texts)
+
+        with self._lock:
+            results = {}
+            missing = []
+            for text in unique:
+                value = self._memo.get((kind, text))
+                if value is None:
+                    missing.append(text)
+                else:
+                    self._memo.move_to_end((kind, text))
+                    results[text] = value
+            self.stats['hits'] += len(unique) - len(missing)
+
+            digests = None
+            if missing and self._conn is not None:
+                disk_kind = f"{kind}:v{NORMALIZER_VERSION}"
+                digests = {content_hash(text): text for text in missing}
+                loaded = self._load(disk_kind, digests)
+                self.stats['disk_hits'] += len(loaded)
+                for digest, value in loaded.items():
+                    results[digests.pop(digest)] = value
+                self._remember(((kind, text), results[text]) for text in missing if text in results)
+                missing = list(digests.values())
+
+            if missing:
+                if kind in BATCH_ANALYZERS:
+                    values = BATCH_ANALYZERS[kind](missing)
+                else:
+                    values = [ANALYZERS[kind](text) for text in missing]
+                results.update(zip(missing, values))
+                self._remember(((kind, text), value) for text, value in zip(missing, values))
+                self.stats['misses'] += len(missing)
+                if self._conn is not None:
+                    by_text = {text: digest for digest, text in digests.items()}
+                    self._store(disk_kind, [(by_text[text], value) for text, value in zip(missing, values)])
+
+        return [results[text] for text in texts]
+
+    def analyze(self, kind, text):
+        return self.analyze_many(kind, [text])[0]
+
+    def normalize_many(self, texts):
+        return self.analyze_many('normalize', texts)
+
+    def compact_many(self, texts):
+        return self.analyze_many('compact', texts)
+
+    def tokens_many(self, texts):
+        return self.analyze_many('tokens', texts)
+
+    def morphemes_many(self, texts):
+        return self.analyze_many('morphemes', texts)
+
+    def clear(self):
+        """메모리와 디스크 캐시를 모두 비움"""
+        with self._lock:
+            self._memo.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM text_cache")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """프로세스 공용 메모리 캐시"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TextCache()
+        return _default_cache
@@ -0,0 +1,294 @@
+"""
+참가자 응답 쓰기 지연(write-behind) 큐
+완료 페이지는 행을 큐에 넣기만 하고, 백그라운드 워커가 flush 간격마다
+대기 중인 행을 모아 한 번의 append_rows 호출로 기록합니다.
+
+spool을 지정하면 모든 행이 먼저 로컬 스풀에 기록되고, 워커는 기록에 성공한
+행만 동기화 완료로 표시합니다. 큐가 가득 찼거나 프로세스가 재시작되어도
+스풀에 남은 행은 워커가 주기적으로 다시 가져와 올립니다.
+
+기록 실패는 일시적 실패와 영구 실패로 나눕니다 (classify_error).
+일시적 실패(네트워크, 429/5xx)는 지수 백오프로 같은 배치를 다시 시도하고,
+영구 실패(400 등 잘못된 행, 헤더 불일치)는 그 행을 스풀에 실패로 표시(격리)한 뒤
+다음 행으로 넘어갑니다. 격리된 행은 워커가 다시 시작될 때(앱 재시작) 한 번 더 시도합니다.
+
+워커는 한 주기에서 예외가 나도 기록하고 다음 주기로 넘어가며,
+submit 때 워커가 죽어 있으면 다시 시작합니다.
+"""
+import logging
+import queue
+import threading
+import time
+
+from sheets_client import HeaderMismatchError
+from sheets_writer import status_code
+
+logger = logging.getLogger(__name__)
+
+# 기록 실패 분류
+TRANSIENT = 'transient'  # 다시 시도하면 성공할 수 있음 (네트워크 오류, 429/5xx, 인증 갱신)
+PERMANENT = 'permanent'  # 배치 안의 어떤 행 때문에 실패 (400 등) → 배치를 나눠 실패한 행만 격리
+SCHEMA = 'schema'        # 저장소 헤더가 맞지 않음 → 나눠도 같으므로 배치 전체 격리
+
+# 4xx 중 일시적인 상태 코드 (토큰 만료, 요청 시간 초과, 쿼터)
+TRANSIENT_CLIENT_STATUS = {401, 408, 429}
+
+# 일시적 실패가 이어질 때 다시 시도하기까지의 최대 대기 시간(초)
+MAX_BACKOFF_SEC = 300.0
+
+
+def classify_error(error):
+    """sink 예외 → TRANSIENT | PERMANENT | SCHEMA"""
+    if isinstance(error, HeaderMismatchError):
+        return SCHEMA
+    if isinstance(error, (ValueError, TypeError)):
+        return PERMANENT
+    status = status_code(error)
+    if status is not None and 400 <= status < 500 and status not in TRANSIENT_CLIENT_STATUS:
+        return PERMANENT
+    return TRANSIENT
+
+
+class WriteBehindQueue:
+    """프로세스 공용 쓰기 큐
+
+    sink: 행 목록을 받아 한 번에 기록하는 함수 (실패 시 예외 발생)
+    flush_interval: 배치를 모으는 최대 대기 시간(초), 즉 최대 호출 빈도
+    max_batch: 한 번의 sink 호출에 담을 최대 행 수
+    max_pending: 큐에 쌓일 수 있는 최대 행 수 (초과 시 submit이 queue.Full 발생)
+    spool: SubmissionSpool (선택) - 지정 시 큐는 스풀의 메모리 캐시 역할
+    sweep_interval: 스풀에 남은 미동기화 행을 다시 확인하는 간격(초)
+    max_backoff: 일시적 실패 후 재시도 대기 시간의 상한(초), flush_interval부터 두 배씩 늘어남
+    classify: sink 예외를 TRANSIENT/PERMANENT/SCHEMA로 나누는 함수
+    """
+
+    def __init__(self, sink, flush_interval=2.0, max_batch=100, max_pending=1000,
+                 spool=None, sweep_interval=30.0, max_backoff=MAX_BACKOFF_SEC, classify=classify_error):
+        self._sink = sink
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._spool = spool
+        self.sweep_interval = sweep_interval
+        self.max_backoff = max_backoff
+        self._classify = classify
+        self._consecutive_failures = 0
+        self._inflight = set()  # 큐 또는 배치에 들어 있는 스풀 ID
+        self._retry_batch = []
+        self._unmarked = []     # 기록은 되었지만 스풀에 동기화 완료로 표시하지 못한 ID
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'submitted': 0, 'written': 0, 'flushes': 0, 'failures': 0, 'quarantined': 0,
+                      'worker_errors': 0}
+        self.last_error = None
+
+    def _count(self, key, value=1):
+        # 워커와 요청 스레드가 함께 갱신
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def start(self):
+        """워커 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sst-write-behind", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def submit(self, row, timeout=1.0, submission_id=None):
+        """행을 큐에 추가하고, 새로 추가되었는지 여부 반환
+
+        스풀이 없으면 큐가 가득 차 timeout 내에 자리가 없을 때 queue.Full 발생.
+        스풀이 있으면 행은 이미 디스크에 기록되었으므로 큐가 가득 차도 예외 없이
+        반환하고, 다음 스풀 확인 때 업로드됩니다. 같은 submission_id로 이미
+        기록된 행은 다시 쓰지 않습니다.
+        """
+        # 워커가 예기치 않게 종료되었으면 다시 시작 (cache_resource로 큐는 재생성되지 않음)
+        self.start()
+        if self._spool is None:
+            self._queue.put((None, row), timeout=timeout)
+        else:
+            row_id = self._spool.add(row, submission_id=submission_id)
+            if row_id is None:
+                return False
+            self._enqueue_spooled(row_id, row)
+        self._count('submitted')
+        return True
+
+    def _enqueue_spooled(self, row_id, row):
+        with self._lock:
+            if row_id in self._inflight:
+                return True
+            try:
+                self._queue.put_nowait((row_id, row))
+            except queue.Full:
+                return False
+            self._inflight.add(row_id)
+            return True
+
+    def sweep_spool(self):
+        """스풀에 남은 미동기화 행을 큐에 다시 넣음 (재시작/큐 포화 복구)"""
+        if self._spool is None:
+            return 0
+        free = self._queue.maxsize - self._queue.qsize()
+        if free <= 0:
+            return 0
+        with self._lock:
+            inflight = set(self._inflight)
+        count = 0
+        for row_id, row in self._spool.pending(limit=free, exclude=inflight):
+            if not self._enqueue_spooled(row_id, row):
+                break
+            count += 1
+        return count
+
+    def pending(self):
+        """아직 기록되지 않은 행 수"""
+        if self._spool is not None:
+            return self._spool.pending_count()
+        return self._queue.unfinished_tasks
+
+    def wait_idle(self, timeout=None):
+        """대기 중인 행이 모두 기록될 때까지 대기 (성공 여부 반환)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending() > 0:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _collect_batch(self):
+        """flush 간격 동안 최대 max_batch개의 행을 모음"""
+        batch = self._retry_batch
+        self._retry_batch = []
+        while not batch:
+            try:
+                batch = [self._queue.get(timeout=self.sweep_interval)]
+            except queue.Empty:
+                self.sweep_spool()
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # 이전 프로세스에서 올리지 못한 행부터 복구 (격리된 행도 한 번 더 시도)
+        try:
+            if self._spool is not None:
+                self._spool.retry_failed()
+            self.sweep_spool()
+        except Exception as e:
+            self._worker_error(e)
+        while True:
+            try:
+                self._flush_once()
+            except Exception as e:
+                # 한 주기의 실패(스풀 SQLite 오류 등)로 워커가 끝나지 않도록 기록만 하고 계속
+                self._worker_error(e)
+                time.sleep(self.flush_interval)
+
+    def _worker_error(self, error):
+        self.last_error = error
+        self._count('worker_errors')
+        logger.exception("쓰기 큐 워커 오류, 계속 진행: %s", error)
+
+    def _mark_synced(self, ids):
+        """스풀에 동기화 완료 표시 (실패하면 다음 주기에 다시 시도, 그동안 ID는 큐 작업 중으로 유지)"""
+        ids = self._unmarked + ids
+        self._unmarked = []
+        if self._spool is not None:
+            try:
+                self._spool.mark_synced(ids)
+            except Exception:
+                # 이미 기록된 행이므로 다시 올리지 않도록 _inflight에 남겨 둠
+                self._unmarked = ids
+                raise
+        with self._lock:
+            self._inflight.difference_update(ids)
+
+    def _retry_delay(self):
+        # flush_interval, 2배, 4배, ... (max_backoff까지)
+        return min(self.max_backoff, self.flush_interval * 2 ** (self._consecutive_failures - 1))
+
+    def _write(self, batch, written, quarantined):
+        """batch 기록 (일시적 실패는 예외 전달)
+
+        PERMANENT면 배치를 반으로 나눠 다시 기록해 실패한 행만 격리하고, SCHEMA면 배치 전체를 격리합니다.
+        처리한 항목은 batch 앞쪽부터 차례로 written 또는 quarantined((항목, 예외))에 추가됩니다.
+        """
+        started = time.perf_counter()
+        try:
+            self._sink([row for _, row in batch])
+        except Exception as e:
+            kind = self._classify(e)
+            if kind == TRANSIENT:
+                raise
+            if kind == SCHEMA or len(batch) == 1:
+                quarantined.extend((entry, e) for entry in batch)
+                return
+            middle = len(batch) // 2
+            self._write(batch[:middle], written, quarantined)
+            self._write(batch[middle:], written, quarantined)
+            return
+
+        # 저장 1회(sink 호출)의 지연: 부하 테스트 등에서 로그 레코드의 sink_ms/rows로 수집
+        sink_ms = (time.perf_counter() - started) * 1000
+        logger.debug("응답 %d건 기록 (%.1fms)", len(batch), sink_ms,
+                     extra={'sink_ms': sink_ms, 'rows': len(batch)})
+        self._count('flushes')
+        self._count('written', len(batch))
+        written.extend(batch)
+
+    def _quarantine(self, failed):
+        """영구 실패한 행을 스풀에 실패로 표시 (스풀이 없으면 기록만 하고 버림)"""
+        self._count('quarantined', len(failed))
+        logger.error("응답 %d건을 기록할 수 없어 격리, 다음 행으로 진행: %s", len(failed), failed[0][1])
+        for _ in failed:
+            self._queue.task_done()
+        ids = [row_id for (row_id, _), _ in failed if row_id is not None]
+        if self._spool is not None and ids:
+            # 표시에 실패하면 ID가 _inflight에 남아 이 프로세스에서는 다시 올리지 않음
+            self._spool.mark_failed([(row_id, str(error)) for (row_id, _), error in failed if row_id is not None])
+        with self._lock:
+            self._inflight.difference_update(ids)
+
+    def _finish(self, written, quarantined):
+        if quarantined:
+            self._quarantine(quarantined)
+        for _ in written:
+            self._queue.task_done()
+        self._mark_synced([row_id for row_id, _ in written if row_id is not None])
+
+    def _flush_once(self):
+        if self._unmarked:
+            self._mark_synced([])
+        batch = self._collect_batch()
+        written, quarantined = [], []
+        try:
+            self._write(batch, written, quarantined)
+        except Exception as e:
+            # 일시적 실패: 아직 처리하지 못한 행은 버리지 않고 지수 백오프 뒤 다시 시도
+            self._retry_batch = batch[len(written) + len(quarantined):]
+            self.last_error = e
+            self._count('failures')
+            self._consecutive_failures += 1
+            delay = self._retry_delay()
+            logger.warning("응답 %d건 기록 실패, %.1f초 뒤 재시도: %s", len(self._retry_batch), delay, e)
+            try:
+                self._finish(written, quarantined)
+            finally:
+                time.sleep(delay)
+            return
+
+        self._consecutive_failures = 0
+        self._finish(written, quarantined)